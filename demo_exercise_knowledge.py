@@ -6,105 +6,148 @@ This script demonstrates how the exercise knowledge base can be used
 to enhance activity parsing and provide semantic search capabilities.
 """
 
+import argparse
 import asyncio
+import functools
+import json
+import logging
 import os
+import socket
 import sys
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-# Add the src directory to the path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+PROJECT_ROOT = str(Path(__file__).parent)
 
-from exercise_knowledge import ExerciseKnowledgeBase
+logger = logging.getLogger(__name__)
 
-async def demo_exercise_knowledge():
-    """Demonstrate exercise knowledge base functionality."""
-    print("🏃 Strava Activity Agent - Exercise Knowledge Demo")
-    print("=" * 50)
-    
-    # Initialize the exercise knowledge base
-    print("\n1. Initializing Exercise Knowledge Base...")
-    # Try different ports in case 8080 is occupied
-    for port in [8081, 8082, 8080]:
+# Maximum number of knowledge base lookups in flight at once
+MAX_CONCURRENT_LOOKUPS = 8
+
+# Local Weaviate ports to try, in order of preference
+WEAVIATE_PORTS = [8081, 8082, 8080]
+
+def _probe_port(host: str, ports: List[int], timeout: float = 0.2) -> Optional[int]:
+    """Return the first port accepting TCP connections on host, or None."""
+    for port in ports:
         try:
-            kb = ExerciseKnowledgeBase(weaviate_url=f"http://localhost:{port}")
-            if kb.client:
-                print(f"✅ Connected to Weaviate on port {port}")
-                break
-        except:
+            with socket.create_connection((host, port), timeout=timeout):
+                return port
+        except OSError as e:
+            logger.debug("Weaviate port %d not reachable: %s", port, e)
             continue
-    else:
-        kb = ExerciseKnowledgeBase()  # Try default
+    return None
+
+# Demo search queries
+TEST_QUERIES = [
+    "I went running",
+    "did some lifting at the gym", 
+    "yoga session",
+    "bike ride",
+    "swimming laps",
+    "crossfit workout",
+    "trail hiking",
+    "spinning class",
+    "pilates",
+    "marathon training"
+]
+
+SPORT_TYPES = ["Run", "Ride", "WeightTraining", "Yoga", "Swim"]
+
+TEST_CONTEXTS = [
+    ("Run", {"location": "park", "time_of_day": "morning"}),
+    ("WeightTraining", {"location": "gym", "intensity": "high"}),
+    ("Yoga", {"location": "studio", "feeling": "relaxed"})
+]
+
+async def collect_report(kb, batch_size: int, concurrency: int) -> Dict[str, Any]:
+    """Run every demo lookup and collect the results into a report dictionary."""
+    # The knowledge base client is synchronous, so run the independent
+    # lookups in worker threads and await them together
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    
+    async def run_lookup(func, *args, **kwargs):
+        async with semaphore:
+            return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def search_all():
+        if not kb.embedder:
+            batches = [TEST_QUERIES[i:i + batch_size] for i in range(0, len(TEST_QUERIES), batch_size)]
+            batch_results = await asyncio.gather(
+                *(run_lookup(kb.search_exercises_batch, batch, limit=3) for batch in batches)
+            )
+            return [results for batch in batch_results for results in batch]
+        # Embed every query in one batched pass, then search by vector
+        vectors = await run_lookup(kb.embed_many, TEST_QUERIES)
+        return await asyncio.gather(*(run_lookup(kb.search_exercises_by_vector, vector, 3) for vector in vectors))
     
-    if not kb.client:
-        print("❌ Weaviate not available. This demo requires Weaviate to be running.")
-        print("   You can run Weaviate locally with Docker:")
-        print("   docker run -p 8081:8080 -p 50051:50051 cr.weaviate.io/semitechnologies/weaviate:1.26.1")
-        print("   (Note: Using port 8081 since 8080 might be in use)")
-        return
-    
-    print("✅ Exercise Knowledge Base initialized successfully!")
-    
-    # Demo search queries
-    test_queries = [
-        "I went running",
-        "did some lifting at the gym", 
-        "yoga session",
-        "bike ride",
-        "swimming laps",
-        "crossfit workout",
-        "trail hiking",
-        "spinning class",
-        "pilates",
-        "marathon training"
-    ]
+    started = time.perf_counter()
+    all_results, all_suggestions, *enhanced_contexts = await asyncio.gather(
+        search_all(),
+        run_lookup(kb.get_exercise_suggestions_batch, SPORT_TYPES),
+        *(run_lookup(kb.enhance_activity_context, sport_type, context) for sport_type, context in TEST_CONTEXTS)
+    )
+    elapsed = time.perf_counter() - started
     
+    return {
+        "searches": dict(zip(TEST_QUERIES, all_results)),
+        "suggestions": dict(zip(SPORT_TYPES, all_suggestions)),
+        "contexts": {
+            sport_type: {"original": context, "enhanced": enhanced}
+            for (sport_type, context), enhanced in zip(TEST_CONTEXTS, enhanced_contexts)
+        },
+        "cache": kb.cache_stats(),
+        "elapsed_seconds": elapsed
+    }
+
+def render_report(report: Dict[str, Any]):
+    """Print a report in the human-readable demo format."""
     print("\n2. Testing Exercise Term Search...")
     print("-" * 40)
     
-    for query in test_queries:
-        print(f"\n🔍 Query: '{query}'")
-        results = kb.search_exercises(query, limit=3)
+    # Buffer each section's result lines and write them in one call
+    out = []
+    w = out.append
+    for query, results in report["searches"].items():
+        w(f"\n🔍 Query: '{query}'\n")
         
         if results:
             for i, result in enumerate(results, 1):
-                print(f"   {i}. {result['name']} (Strava: {result['sport_type']})")
-                print(f"      Score: {result.get('score', 'N/A'):.3f}")
+                w(f"   {i}. {result['name']} (Strava: {result['sport_type']})\n")
+                w(f"      Score: {result.get('score', 'N/A'):.3f}\n")
                 if result.get('keywords'):
-                    print(f"      Keywords: {', '.join(result['keywords'][:5])}")
+                    w(f"      Keywords: {', '.join(result['keywords'][:5])}\n")
         else:
-            print("   No matches found.")
+            w("   No matches found.\n")
+    sys.stdout.write("".join(out))
     
     print("\n3. Testing Sport Type Suggestions...")
     print("-" * 40)
     
-    sport_types = ["Run", "Ride", "WeightTraining", "Yoga", "Swim"]
-    
-    for sport_type in sport_types:
-        suggestions = kb.get_exercise_suggestions(sport_type)
-        print(f"\n🏃 {sport_type} suggestions:")
+    out.clear()
+    for sport_type, suggestions in report["suggestions"].items():
+        w(f"\n🏃 {sport_type} suggestions:\n")
         
         if suggestions:
             for suggestion in suggestions[:2]:  # Show top 2
-                print(f"   • {suggestion['name']}")
+                w(f"   • {suggestion['name']}\n")
                 if suggestion.get('keywords'):
-                    print(f"     Keywords: {', '.join(suggestion['keywords'][:3])}")
+                    w(f"     Keywords: {', '.join(suggestion['keywords'][:3])}\n")
         else:
-            print("   No suggestions available.")
+            w("   No suggestions available.\n")
+    sys.stdout.write("".join(out))
     
     print("\n4. Testing Context Enhancement...")
     print("-" * 40)
     
-    test_contexts = [
-        ("Run", {"location": "park", "time_of_day": "morning"}),
-        ("WeightTraining", {"location": "gym", "intensity": "high"}),
-        ("Yoga", {"location": "studio", "feeling": "relaxed"})
-    ]
-    
-    for sport_type, context in test_contexts:
-        enhanced = kb.enhance_activity_context(sport_type, context)
-        print(f"\n🔧 Enhanced context for {sport_type}:")
-        print(f"   Original: {context}")
-        print(f"   Enhanced: {enhanced}")
+    out.clear()
+    for sport_type, entry in report["contexts"].items():
+        w(f"\n🔧 Enhanced context for {sport_type}:\n")
+        w(f"   Original: {entry['original']}\n")
+        w(f"   Enhanced: {entry['enhanced']}\n")
+    sys.stdout.write("".join(out))
     
     print("\n5. Demo Complete! 🎉")
     print("=" * 50)
@@ -115,8 +158,87 @@ async def demo_exercise_knowledge():
     print("• Semantic search for exercise terms and concepts")
     print("• Improved AI prompt generation with relevant terminology")
     
-    # Close the connection
-    kb.close()
+    stats = report["cache"]
+    print(f"\nQuery cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"(hit rate {stats['hit_rate']:.0%})")
+    print(f"Lookups completed in {report['elapsed_seconds']:.3f}s")
+
+async def demo_exercise_knowledge(
+    json_output: bool = False,
+    batch_size: int = len(TEST_QUERIES),
+    concurrency: int = MAX_CONCURRENT_LOOKUPS
+) -> int:
+    """
+    Demonstrate exercise knowledge base functionality.
+    
+    Args:
+        json_output: Write the collected results as JSON to stdout instead of the
+            human-readable format (progress messages go to stderr)
+        batch_size: Number of search queries sent per batched request
+        concurrency: Maximum number of lookups in flight at once
+        
+    Returns:
+        Process exit code
+    """
+    say = print if not json_output else functools.partial(print, file=sys.stderr)
+    
+    say("🏃 Strava Activity Agent - Exercise Knowledge Demo")
+    say("=" * 50)
+    
+    # Import lazily so the heavy Weaviate client is only loaded when the demo runs
+    if "src.exercise_knowledge" not in sys.modules and PROJECT_ROOT not in sys.path:
+        # Add the project root to the path so the src package is importable
+        sys.path.insert(0, PROJECT_ROOT)
+    from src.exercise_knowledge import ExerciseKnowledgeBase
+    
+    # Initialize the exercise knowledge base
+    say("\n1. Initializing Exercise Knowledge Base...")
+    # Try different ports in case 8080 is occupied, but only build the client once
+    port = _probe_port("localhost", WEAVIATE_PORTS)
+    if port:
+        kb = ExerciseKnowledgeBase(weaviate_url=f"http://localhost:{port}")
+        if kb.client:
+            say(f"✅ Connected to Weaviate on port {port}")
+    else:
+        kb = ExerciseKnowledgeBase()  # Try default
+    
+    # Close the connection even if a lookup fails
+    async with kb:
+        if not kb.client:
+            say("❌ Weaviate not available. This demo requires Weaviate to be running.")
+            say("   You can run Weaviate locally with Docker:")
+            say("   docker run -p 8081:8080 -p 50051:50051 cr.weaviate.io/semitechnologies/weaviate:1.26.1")
+            say("   (Note: Using port 8081 since 8080 might be in use)")
+            return 1
+        
+        say("✅ Exercise Knowledge Base initialized successfully!")
+        
+        # Keep the cold first query out of the timed lookups
+        await asyncio.get_running_loop().run_in_executor(None, kb.warmup)
+        
+        report = await collect_report(kb, batch_size=batch_size, concurrency=concurrency)
+        
+        if json_output:
+            json.dump(report, sys.stdout)
+            sys.stdout.write("\n")
+        else:
+            render_report(report)
+    
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Exercise knowledge base demo")
+    parser.add_argument("--json", dest="json_output", action="store_true",
+                        help="write results as JSON to stdout (for benchmarking)")
+    parser.add_argument("--batch-size", type=int, default=len(TEST_QUERIES),
+                        help="search queries per batched request (default: all)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_LOOKUPS,
+                        help=f"maximum lookups in flight (default: {MAX_CONCURRENT_LOOKUPS})")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1 or args.concurrency < 1:
+        parser.error("--batch-size and --concurrency must be at least 1")
+    return args
 
 if __name__ == "__main__":
-    asyncio.run(demo_exercise_knowledge())
\ No newline at end of file
+    sys.exit(asyncio.run(demo_exercise_knowledge(**vars(parse_args()))))
@@ -3,8 +3,15 @@ Example script demonstrating how to use the Strava Activity Agent
 """
 
 import os
-from datetime import datetime
-from src.strava_activity_agent import StravaActivityAgent
+
+# Sample activity payload shown in the example output
+_EXAMPLE_ACTIVITY = {
+    "name": "Morning Run",  # Optional - AI can generate this
+    "sport_type": "Run",
+    "elapsed_time": 3600,  # 1 hour in seconds
+    "distance": 5000,      # 5km in meters
+    "start_date_local": "2024-01-01T07:00:00"
+}
 
 def main():
     """
@@ -14,6 +21,9 @@ def main():
     print("=" * 50)
     
     try:
+        # Import lazily so the banner shows before the heavy client libraries load
+        from src.strava_activity_agent import StravaActivityAgent
+        
         # Initialize the agent
         print("Initializing agent...")
         agent = StravaActivityAgent()
@@ -34,15 +44,7 @@ def main():
         print("Once authenticated, you can create activities like this:")
         
         # This is just for demonstration - won't work without auth tokens
-        example_activity = {
-            "name": "Morning Run",  # Optional - AI can generate this
-            "sport_type": "Run",
-            "elapsed_time": 3600,  # 1 hour in seconds
-            "distance": 5000,      # 5km in meters
-            "start_date_local": datetime.now().isoformat()
-        }
-        
-        print(f"Activity data: {example_activity}")
+        print(f"Activity data: {_EXAMPLE_ACTIVITY}")
         print("\n🤖 AI Features:")
         print("- Generates creative activity names")
         print("- Creates motivational descriptions")
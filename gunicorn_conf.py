@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the Strava Activity Agent web app.
+
+Usage:
+    gunicorn -c gunicorn_conf.py main:app
+
+Run with REDIS_URL set so every worker sees the same user sessions.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# 2n+1 uvicorn workers by default, one process (and GIL) each
+workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# The agent opens Weaviate gRPC and HTTP connections at import, which must
+# not be shared across fork(), so each worker loads the app itself
+preload_app = False
+
+keepalive = 5
@@ -6,34 +6,83 @@ allowing users to authenticate with Strava and create AI-powered activities.
 """
 
 import os
+import asyncio
+import functools
+import importlib.util
+import hashlib
 import logging
-from typing import Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+import math
+import secrets
+from datetime import date
+from pathlib import Path
+from typing import AsyncIterator, Optional, Dict, Any
+from fastapi import Depends, FastAPI, HTTPException, Request, Form
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import escape
 from pydantic import BaseModel
 import uvicorn
 
 from src.strava_activity_agent import StravaActivityAgent
+from src.session_store import create_session_store
+
+# Prefer uvloop and httptools (installed by uvicorn[standard]); uvloop is unavailable on Windows
+UVICORN_LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+UVICORN_HTTP = "httptools" if importlib.util.find_spec("httptools") else "h11"
 
 # Set up logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
+)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Strava Activity Agent",
     description="AI-powered Strava activity creation with Writer AI",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+
+# Compress HTML and JSON responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Load page templates once; compiled templates are cached in memory and on disk
+BASE_DIR = Path(__file__).parent
+JINJA_CACHE_DIR = BASE_DIR / ".jinja_cache"
+JINJA_CACHE_DIR.mkdir(exist_ok=True)
+templates = Environment(
+    loader=FileSystemLoader(BASE_DIR / "templates"),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
 )
 
+class CachedStaticFiles(StaticFiles):
+    """Static files served with far-future caching; URLs carry a content version for busting."""
+    
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+STATIC_DIR = BASE_DIR / "static"
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+
+# Version static asset URLs by content so browsers refetch them only when they change
+templates.globals["static_version"] = hashlib.md5(
+    b"".join(path.read_bytes() for path in sorted(STATIC_DIR.iterdir()) if path.is_file())
+).hexdigest()[:12]
+
 # Initialize the agent
 try:
     agent = StravaActivityAgent()
     logger.info("Strava Activity Agent initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize agent: {e}")
+    logger.error("Failed to initialize agent: %s", e)
     agent = None
 
 # Pydantic models for API requests
@@ -46,283 +95,142 @@ class ActivityUpdateRequest(BaseModel):
     regenerate_name: bool = False
     description_style: str = "motivational"
 
-# Store user sessions (in production, use a proper session store)
-user_sessions = {}
+# Store user sessions in Redis when REDIS_URL is set, otherwise in process memory
+session_store = create_session_store(os.getenv("REDIS_URL"))
+SESSION_COOKIE = "session_id"
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 30 * 24 * 3600))
+
+async def get_session(request: Request) -> Optional[Dict[str, Any]]:
+    """Look up the session referenced by the request's session cookie."""
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        return None
+    return await session_store.get(session_id)
+
+def session_agent_for(session_data: Dict[str, Any]) -> StravaActivityAgent:
+    """Get an agent bound to the session's own Strava tokens."""
+    return agent.for_session(
+        session_data['access_token'],
+        session_data['refresh_token'],
+        session_data['expires_at']
+    )
+
+async def save_refreshed_tokens(session_id: str, session_data: Dict[str, Any], session_agent: StravaActivityAgent):
+    """Write tokens the agent refreshed during the request back to the session."""
+    client = session_agent.strava_client
+    if client.access_token == session_data['access_token']:
+        return
+    await session_store.set(session_id, {
+        **session_data,
+        'access_token': client.access_token,
+        'refresh_token': client.refresh_token,
+        'expires_at': client.token_expires_at
+    }, SESSION_TTL_SECONDS)
+
+async def get_authed_agent(request: Request) -> AsyncIterator[StravaActivityAgent]:
+    """Resolve an agent for the current session's Strava tokens, saving any refreshed tokens afterwards."""
+    if not agent:
+        raise HTTPException(status_code=500, detail="Agent not initialized")
+    
+    session_id = request.cookies.get(SESSION_COOKIE)
+    session_data = await session_store.get(session_id) if session_id else None
+    if not session_data:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    session_agent = session_agent_for(session_data)
+    try:
+        yield session_agent
+    finally:
+        await save_refreshed_tokens(session_id, session_data, session_agent)
+
+@app.on_event("startup")
+async def log_event_loop():
+    """Log which event loop implementation is serving requests."""
+    logger.info("Serving with event loop %s", asyncio.get_running_loop().__class__.__module__)
+
+@app.on_event("shutdown")
+async def close_session_store():
+    """Release the session store connection on shutdown."""
+    await session_store.close()
+
+@app.on_event("shutdown")
+async def close_agent():
+    """Close the agent's HTTP clients on shutdown."""
+    if agent:
+        await agent.aclose()
+
+# Daily fitness jokes shown in the home page title
+_JOKES = (
+    "Why don't runners ever get tired of puns? Because they're always running them into the ground! 🏃‍♂️",
+    "What do you call a cyclist who doesn't ride bikes? A stand-up comedian! 🚴‍♂️",
+    "Why did the swimmer bring a ladder to the pool? Because they heard the pool had deep ends! 🏊‍♂️",
+    "What's a runner's favorite type of music? Jog and roll! 🎵",
+    "Why don't weightlifters ever get cold? Because they're always pumping iron! 🏋️‍♂️",
+    "What do you call a yoga instructor who moonlights as a comedian? A stretch performer! 🧘‍♀️",
+    "Why did the hiker break up with the mountain? It was just too rocky! 🥾",
+    "What's the difference between a marathon and a joke? One's a long run, the other's a fun run! 😄",
+    "Why don't bikes ever get speeding tickets? Because they're two-tired to speed! 🚲",
+    "What do you call a workout that's also a breakfast? Eggs-ercise! 🍳",
+    "Why did the treadmill go to therapy? It was tired of people running away from their problems! 🏃‍♀️",
+    "What's a swimmer's favorite dessert? Pool-ding! 🍮",
+    "Why don't fitness trackers ever lie? Because they always step up to the truth! ⌚",
+    "What do you call a lazy workout? A rest-ercise! 😴",
+    "Why did the gym close down? It just wasn't working out! 💪"
+)
+
+# The joke only changes once a day, so remember the last pick
+_JOKE_CACHE = {"date": None, "joke": None}
 
 def get_daily_joke_title():
     """Generate a daily fitness joke for the title based on the current date."""
-    import hashlib
-    from datetime import datetime
+    today = date.today()
+    if _JOKE_CACHE["date"] == today:
+        return _JOKE_CACHE["joke"]
     
-    jokes = [
-        "Why don't runners ever get tired of puns? Because they're always running them into the ground! 🏃‍♂️",
-        "What do you call a cyclist who doesn't ride bikes? A stand-up comedian! 🚴‍♂️",
-        "Why did the swimmer bring a ladder to the pool? Because they heard the pool had deep ends! 🏊‍♂️",
-        "What's a runner's favorite type of music? Jog and roll! 🎵",
-        "Why don't weightlifters ever get cold? Because they're always pumping iron! 🏋️‍♂️",
-        "What do you call a yoga instructor who moonlights as a comedian? A stretch performer! 🧘‍♀️",
-        "Why did the hiker break up with the mountain? It was just too rocky! 🥾",
-        "What's the difference between a marathon and a joke? One's a long run, the other's a fun run! 😄",
-        "Why don't bikes ever get speeding tickets? Because they're two-tired to speed! 🚲",
-        "What do you call a workout that's also a breakfast? Eggs-ercise! 🍳",
-        "Why did the treadmill go to therapy? It was tired of people running away from their problems! 🏃‍♀️",
-        "What's a swimmer's favorite dessert? Pool-ding! 🍮",
-        "Why don't fitness trackers ever lie? Because they always step up to the truth! ⌚",
-        "What do you call a lazy workout? A rest-ercise! 😴",
-        "Why did the gym close down? It just wasn't working out! 💪"
-    ]
+    # Knuth multiplicative hash of the date ordinal (same joke per day, shuffled across days)
+    joke = _JOKES[((today.toordinal() * 2654435761) & 0xFFFFFFFF) % len(_JOKES)]
     
-    # Use current date to seed the joke selection (same joke per day)
-    today = datetime.now().strftime("%Y-%m-%d")
-    joke_hash = int(hashlib.md5(today.encode()).hexdigest(), 16)
-    return jokes[joke_hash % len(jokes)]
+    _JOKE_CACHE["date"] = today
+    _JOKE_CACHE["joke"] = joke
+    return joke
 
 @app.get("/", response_class=HTMLResponse)
-async def home():
+async def home(request: Request):
     """Home page with improved UI and authentication state."""
-    is_authenticated = len(user_sessions) > 0
+    session_data = await get_session(request)
+    is_authenticated = session_data is not None
     daily_joke = get_daily_joke_title()
     
     # Get user info if authenticated
     user_name = ""
     if is_authenticated:
-        first_session = list(user_sessions.values())[0]
-        user_name = first_session.get('athlete', {}).get('firstname', 'Athlete')
+        user_name = session_data.get('athlete', {}).get('firstname', 'Athlete')
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Strava Activity Agent - AI-Powered Fitness</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * {{ box-sizing: border-box; }}
-            body {{ 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                margin: 0; 
-                padding: 20px; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-            }}
-            .container {{ 
-                max-width: 900px; 
-                margin: 0 auto; 
-                background: white; 
-                padding: 40px; 
-                border-radius: 20px; 
-                box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            }}
-            .header {{
-                text-align: center;
-                margin-bottom: 40px;
-                padding-bottom: 20px;
-                border-bottom: 2px solid #f0f0f0;
-            }}
-            h1 {{ 
-                color: #fc4c02; 
-                font-size: 2.5em;
-                margin: 0;
-                font-weight: 300;
-            }}
-            .joke-title {{
-                background: linear-gradient(45deg, #ff6b6b, #feca57);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                font-size: 1.1em;
-                margin: 15px 0;
-                font-weight: 500;
-                min-height: 50px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-            }}
-            .status-bar {{
-                background: {'#d4edda' if is_authenticated else '#fff3cd'};
-                color: {'#155724' if is_authenticated else '#856404'};
-                padding: 15px;
-                border-radius: 10px;
-                margin: 20px 0;
-                text-align: center;
-                font-weight: 500;
-            }}
-            .section {{ 
-                margin: 30px 0; 
-                padding: 25px; 
-                border: 1px solid #e0e0e0; 
-                border-radius: 15px;
-                background: #fafafa;
-                transition: all 0.3s ease;
-            }}
-            .section:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            }}
-            .hidden {{ display: none; }}
-            button {{ 
-                background: linear-gradient(45deg, #fc4c02, #ff6b35);
-                color: white; 
-                padding: 15px 30px; 
-                border: none; 
-                border-radius: 25px; 
-                cursor: pointer; 
-                font-size: 16px;
-                font-weight: 600;
-                transition: all 0.3s ease;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }}
-            button:hover {{ 
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(252, 76, 2, 0.4);
-            }}
-            input, select, textarea {{ 
-                padding: 12px; 
-                margin: 8px 0; 
-                border: 2px solid #ddd; 
-                border-radius: 8px;
-                width: 100%;
-                font-size: 16px;
-                transition: border-color 0.3s ease;
-            }}
-            input:focus, select:focus, textarea:focus {{
-                outline: none;
-                border-color: #fc4c02;
-                box-shadow: 0 0 0 3px rgba(252, 76, 2, 0.1);
-            }}
-            .form-group {{ margin: 20px 0; }}
-            label {{ 
-                display: block; 
-                margin-bottom: 8px; 
-                font-weight: 600;
-                color: #333;
-            }}
-            .description {{ 
-                color: #666; 
-                margin-bottom: 30px;
-                font-size: 1.1em;
-                text-align: center;
-            }}
-            .form-grid {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 20px;
-            }}
-            @media (max-width: 768px) {{
-                .form-grid {{
-                    grid-template-columns: 1fr;
-                }}
-                .container {{
-                    padding: 20px;
-                    margin: 10px;
-                }}
-            }}
-            .submit-btn {{
-                width: 100%;
-                padding: 18px;
-                font-size: 18px;
-                margin-top: 20px;
-            }}
-            .api-docs {{
-                background: #f8f9fa;
-                border-left: 4px solid #fc4c02;
-                padding: 20px;
-                margin: 20px 0;
-            }}
-            .api-docs code {{
-                background: #e9ecef;
-                padding: 2px 6px;
-                border-radius: 4px;
-                font-family: 'Courier New', monospace;
-            }}
-            .user-welcome {{
-                background: linear-gradient(45deg, #28a745, #20c997);
-                color: white;
-                padding: 15px 25px;
-                border-radius: 50px;
-                display: inline-block;
-                margin: 10px 0;
-                font-weight: 600;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🚴‍♂️ Strava Activity Agent 🏃‍♀️</h1>
-                <div class="joke-title">{daily_joke}</div>
-                <p class="description">Create Strava activities with AI-generated descriptions using Writer AI!</p>
-            </div>
-            
-            <div class="status-bar">
-                {'✅ Connected to Strava!' if is_authenticated else '⚠️ Authentication Required'}
-                {f'<div class="user-welcome">Welcome back, {user_name}! 👋</div>' if is_authenticated else ''}
-            </div>
-            
-            <div class="section {'hidden' if is_authenticated else ''}">
-                <h2>🔐 Connect to Strava</h2>
-                <p>First, you need to authenticate with Strava to create activities on your account.</p>
-                <button onclick="window.location.href='/auth/strava'">Connect with Strava 🚀</button>
-            </div>
-            
-            <div class="section {'' if is_authenticated else 'hidden'}">
-                <h2>🎯 Smart Activity Creator</h2>
-                <form action="/activity/prompt" method="post">
-                    <div class="form-group">
-                        <label for="prompt">💬 Tell Me About Your Workout:</label>
-                        <textarea 
-                            name="prompt" 
-                            required 
-                            rows="4" 
-                            placeholder="e.g., 'Just did a GOATED AF workout at Github hack night. 10 one legged squats on both legs and 10 body weight squats.'"
-                            style="resize: vertical; min-height: 100px; font-family: inherit; line-height: 1.4;"
-                        ></textarea>
-                    </div>
-                    <button type="submit" class="submit-btn" style="background: linear-gradient(45deg, #28a745, #20c997);">
-                        Create Activity
-                    </button>
-                </form>
-            </div>
-            
-            <div class="section {'' if is_authenticated else 'hidden'}">
-                <h2>🔧 Developer API</h2>
-                <div class="api-docs">
-                    <p><strong>Interactive API Documentation:</strong> <a href="/docs" target="_blank">View Swagger UI</a></p>
-                    <p><strong>Key Endpoints:</strong></p>
-                    <ul>
-                        <li><code>POST /api/activity/quick</code> - Create activity with minimal input</li>
-                        <li><code>POST /api/activity/create</code> - Create activity with full control</li>
-                        <li><code>PUT /api/activity/{{id}}</code> - Update existing activity</li>
-                        <li><code>GET /api/athlete</code> - Get athlete profile</li>
-                    </ul>
-                </div>
-            </div>
-        </div>
-        
-        <script>
-            // Add some interactive flair
-            document.addEventListener('DOMContentLoaded', function() {{
-                const sections = document.querySelectorAll('.section');
-                sections.forEach(section => {{
-                    section.addEventListener('mouseenter', function() {{
-                        this.style.borderColor = '#fc4c02';
-                    }});
-                    section.addEventListener('mouseleave', function() {{
-                        this.style.borderColor = '#e0e0e0';
-                    }});
-                }});
-                
-                // Auto-focus first input if form is visible
-                const firstInput = document.querySelector('input[name="duration_minutes"]');
-                if (firstInput && !firstInput.closest('.hidden')) {{
-                    setTimeout(() => firstInput.focus(), 500);
-                }}
-            }});
-        </script>
-    </body>
-    </html>
-    """
-    return html_content
+    return HTMLResponse(content=render_home_page(is_authenticated, user_name, daily_joke))
+
+def _compile_home_template(is_authenticated: bool) -> str:
+    """Render the home page for one auth state into a str.format template."""
+    html = templates.get_template("home.html").render(
+        is_authenticated=is_authenticated,
+        user_name="\0user_name\0",
+        daily_joke="\0daily_joke\0"
+    )
+    html = html.replace("{", "{{").replace("}", "}}")
+    return html.replace("\0user_name\0", "{user_name}").replace("\0daily_joke\0", "{daily_joke}")
+
+# Home page variants keyed by is_authenticated; only the user name and joke vary per request
+_HOME_TEMPLATES = {
+    True: _compile_home_template(True),
+    False: _compile_home_template(False)
+}
+
+@functools.lru_cache(maxsize=128)
+def render_home_page(is_authenticated: bool, user_name: str, daily_joke: str) -> bytes:
+    """Render the UTF-8 encoded home page; only the arguments vary, so results are cached."""
+    return _HOME_TEMPLATES[is_authenticated].format(
+        user_name=escape(user_name),
+        daily_joke=escape(daily_joke)
+    ).encode("utf-8")
 
 @app.get("/auth/strava")
 async def start_strava_auth():
@@ -340,246 +248,113 @@ async def strava_callback(code: str, scope: str, request: Request):
         raise HTTPException(status_code=500, detail="Agent not initialized")
     
     try:
-        token_data = agent.authenticate_strava(code)
+        token_data = await agent.authenticate_strava(code)
         
-        # Store tokens in session (in production, use proper session management)
-        session_id = f"user_{token_data['athlete']['id']}"
-        user_sessions[session_id] = {
+        # Store tokens in the session store and hand the browser an opaque session id
+        session_id = secrets.token_urlsafe(32)
+        await session_store.set(session_id, {
             'access_token': token_data['access_token'],
             'refresh_token': token_data['refresh_token'],
             'expires_at': token_data['expires_at'],
             'athlete': token_data['athlete']
-        }
+        }, SESSION_TTL_SECONDS)
         
-        logger.info(f"Successfully authenticated user {token_data['athlete']['firstname']}")
+        logger.info("Successfully authenticated user %s", token_data['athlete']['firstname'])
         
         # Return success page
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Successful</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); text-align: center; }}
-                h1 {{ color: #fc4c02; }}
-                .success {{ color: #28a745; font-size: 18px; margin: 20px 0; }}
-                button {{ background-color: #fc4c02; color: white; padding: 12px 24px; border: none; border-radius: 5px; cursor: pointer; font-size: 16px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🎉 Authentication Successful!</h1>
-                <div class="success">
-                    Welcome, {token_data['athlete']['firstname']}!<br>
-                    You're now connected to Strava and ready to create AI-powered activities.
-                </div>
-                <button onclick="window.location.href='/'">Create Activities</button>
-            </div>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=html_content)
+        html_content = templates.get_template("auth_success.html").render(
+            firstname=token_data['athlete']['firstname']
+        )
+        response = HTMLResponse(content=html_content)
+        response.set_cookie(
+            SESSION_COOKIE,
+            session_id,
+            max_age=SESSION_TTL_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+        return response
         
     except Exception as e:
-        logger.error(f"Authentication failed: {e}")
+        logger.error("Authentication failed: %s", e)
         raise HTTPException(status_code=400, detail=f"Authentication failed: {e}")
 
 @app.post("/activity/prompt")
 async def create_activity_from_prompt(
-    prompt: str = Form(..., description="Natural language description of your activity")
+    request: Request,
+    prompt: str = Form(...)
 ):
     """Create an activity from a natural language prompt."""
     if not agent:
         raise HTTPException(status_code=500, detail="Agent not initialized")
     
     # Check authentication
-    if not user_sessions:
-        return HTMLResponse(content="""
-        <html>
-        <body style="font-family: Arial, sans-serif; margin: 40px; text-align: center;">
-            <h2>⚠️ Authentication Required</h2>
-            <p>Please authenticate with Strava first.</p>
-            <button onclick="window.location.href='/auth/strava'" style="background-color: #fc4c02; color: white; padding: 12px 24px; border: none; border-radius: 5px; cursor: pointer;">
-                Connect with Strava
-            </button>
-        </body>
-        </html>
-        """)
-    
-    # Use the first available session
-    session_data = list(user_sessions.values())[0]
-    agent.set_strava_tokens(
-        session_data['access_token'],
-        session_data['refresh_token'],
-        session_data['expires_at']
-    )
+    session_id = request.cookies.get(SESSION_COOKIE)
+    session_data = await session_store.get(session_id) if session_id else None
+    if not session_data:
+        return HTMLResponse(content=templates.get_template("auth_required.html").render())
     
+    session_agent = session_agent_for(session_data)
     try:
         # Create activity from natural language prompt
-        result = await agent.create_activity_from_prompt(prompt)
+        result = await session_agent.create_activity_from_prompt(prompt)
         
         if result["status"] != "success":
             error_message = result.get("message", "Unknown error occurred")
-            return HTMLResponse(content=f"""
-            <html>
-            <head>
-                <title>Parsing Error</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                    h1 {{ color: #fc4c02; text-align: center; }}
-                    .error {{ background-color: #f8d7da; color: #721c24; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                    .suggestions {{ background-color: #d1ecf1; color: #0c5460; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                    button {{ background-color: #fc4c02; color: white; padding: 12px 24px; border: none; border-radius: 5px; cursor: pointer; font-size: 16px; margin: 10px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <h1>🤔 Unable to Parse Activity</h1>
-                    <div class="error">
-                        <strong>Error:</strong> {error_message}
-                    </div>
-                    <div class="suggestions">
-                        <h3>💡 Try these detailed examples:</h3>
-                        <ul style="line-height: 1.6;">
-                            <li><strong>Basic:</strong> "I went for a 30 minute run this morning"</li>
-                            <li><strong>With location:</strong> "Did a 5k bike ride for 25 minutes around Central Park"</li>
-                            <li><strong>With feeling:</strong> "45 minute yoga session at the studio - felt amazing after!"</li>
-                            <li><strong>With weather:</strong> "Swam for 40 minutes at the pool, covered 2km despite the cold morning"</li>
-                            <li><strong>With achievement:</strong> "First time weight training session for 1 hour at the gym - crushed it!"</li>
-                            <li><strong>Rich context:</strong> "Morning trail hike for 90 minutes with my dog, beautiful sunrise and felt super energetic despite the muddy conditions"</li>
-                        </ul>
-                        <p><strong>💪 Pro tip:</strong> Include activity type, duration, and any details about location, weather, how you felt, who you were with, or special achievements!</p>
-                    </div>
-                    <div style="text-align: center;">
-                        <button onclick="window.location.href='/'">Try Again</button>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """)
+            return HTMLResponse(content=templates.get_template("prompt_error.html").render(
+                error_message=error_message
+            ))
         
         activity = result["activity"]
         parsing_info = result.get("parsing_info", {})
         
         # Return success page with activity details and parsing info
-        html_content = f"""
-        <html>
-        <head>
-            <title>Activity Created from Prompt!</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-                .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                h1 {{ color: #fc4c02; text-align: center; }}
-                .success {{ background-color: #d4edda; color: #155724; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                .activity-info {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                .parsing-info {{ background-color: #e7f3ff; color: #004085; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-                button {{ background-color: #fc4c02; color: white; padding: 12px 24px; border: none; border-radius: 5px; cursor: pointer; font-size: 16px; margin: 10px; }}
-                .confidence {{ font-weight: bold; color: #28a745; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🎉 Activity Created from Your Prompt!</h1>
-                <div class="success">
-                    Your natural language description was successfully parsed and turned into a Strava activity!
-                </div>
-                
-                <div class="parsing-info">
-                    <h3>🧠 AI Parsing Results:</h3>
-                    <p><strong>Original prompt:</strong> "{parsing_info.get('original_prompt', prompt)}"</p>
-                    <p><strong>Confidence:</strong> <span class="confidence">{parsing_info.get('confidence', 0)*100:.1f}%</span></p>
-                    <p><strong>Understood as:</strong> {parsing_info.get('parsed_data', {}).get('sport_type', 'N/A')} for {parsing_info.get('parsed_data', {}).get('duration_minutes', 'N/A')} minutes</p>
-                </div>
-                
-                <div class="activity-info">
-                    <h3>📊 Created Activity:</h3>
-                    <p><strong>Name:</strong> {activity.get('name', 'N/A')}</p>
-                    <p><strong>Type:</strong> {activity.get('sport_type', 'N/A')}</p>
-                    <p><strong>Distance:</strong> {activity.get('distance', 0) / 1000:.2f} km</p>
-                    <p><strong>Duration:</strong> {activity.get('elapsed_time', 0) // 60} minutes</p>
-                    <p><strong>Description:</strong> {activity.get('description', 'N/A')}</p>
-                </div>
-                <div style="text-align: center;">
-                    <button onclick="window.location.href='/'">Create Another Activity</button>
-                    <button onclick="window.open('https://www.strava.com/activities/{activity.get('id')}', '_blank')">
-                        View on Strava
-                    </button>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = templates.get_template("prompt_result.html").render(
+            activity=activity,
+            parsing_info=parsing_info,
+            prompt=prompt
+        )
         return HTMLResponse(content=html_content)
         
     except Exception as e:
-        logger.error(f"Failed to create activity from prompt: {e}")
-        return HTMLResponse(content=f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; margin: 40px; text-align: center;">
-            <h2>❌ Error Creating Activity</h2>
-            <p>Failed to create activity from prompt: {str(e)}</p>
-            <button onclick="window.location.href='/'" style="background-color: #fc4c02; color: white; padding: 12px 24px; border: none; border-radius: 5px; cursor: pointer;">
-                Go Back
-            </button>
-        </body>
-        </html>
-        """)
-
-@app.post("/api/activity/prompt")
-async def api_create_activity_from_prompt(request: PromptActivityRequest):
+        logger.error("Failed to create activity from prompt: %s", e)
+        return HTMLResponse(content=templates.get_template("activity_error.html").render(error=str(e)))
+    finally:
+        await save_refreshed_tokens(session_id, session_data, session_agent)
+
+@app.post("/api/activity/prompt", response_model=None)
+async def api_create_activity_from_prompt(
+    request: PromptActivityRequest,
+    agent: StravaActivityAgent = Depends(get_authed_agent)
+):
     """Create an activity from a natural language prompt via JSON API."""
-    if not agent:
-        raise HTTPException(status_code=500, detail="Agent not initialized")
-    
-    # Check for authentication
-    if not user_sessions:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    
-    # Use the first available session
-    session_data = list(user_sessions.values())[0]
-    agent.set_strava_tokens(
-        session_data['access_token'],
-        session_data['refresh_token'],
-        session_data['expires_at']
-    )
-    
     try:
         result = await agent.create_activity_from_prompt(request.prompt)
         
+        if result["status"] == "rate_limited":
+            headers = {"Retry-After": str(math.ceil(result["retry_after"]))} if result.get("retry_after") else None
+            raise HTTPException(status_code=429, detail=result["message"], headers=headers)
         if result["status"] != "success":
             raise HTTPException(status_code=400, detail=result.get("message", "Failed to parse prompt"))
         
-        return {
+        return ORJSONResponse({
             "success": True, 
             "activity": result["activity"],
             "parsing_info": result.get("parsing_info", {})
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create activity from prompt: {e}")
+        logger.error("Failed to create activity from prompt: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.put("/api/activity/{activity_id}")
-async def api_update_activity(activity_id: int, request: ActivityUpdateRequest):
-    """Update an existing activity."""
-    if not agent:
-        raise HTTPException(status_code=500, detail="Agent not initialized")
-    
-    # Check for authentication
-    if not user_sessions:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    
-    # Use the first available session
-    session_data = list(user_sessions.values())[0]
-    agent.set_strava_tokens(
-        session_data['access_token'],
-        session_data['refresh_token'],
-        session_data['expires_at']
-    )
-    
+@app.put("/api/activity/{activity_id}", response_model=None)
+def api_update_activity(
+    activity_id: int,
+    request: ActivityUpdateRequest,
+    agent: StravaActivityAgent = Depends(get_authed_agent)
+):
+    """Update an existing activity (a plain def, so the blocking Strava and Writer calls run in the threadpool)."""
     try:
         activity = agent.update_activity_with_ai(
             activity_id=activity_id,
@@ -588,36 +363,28 @@ async def api_update_activity(activity_id: int, request: ActivityUpdateRequest):
             regenerate_name=request.regenerate_name,
             description_style=request.description_style
         )
-        return {"success": True, "activity": activity}
+        return ORJSONResponse({"success": True, "activity": activity})
     except Exception as e:
-        logger.error(f"Failed to update activity: {e}")
+        logger.error("Failed to update activity: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/api/athlete")
-async def api_get_athlete():
-    """Get the authenticated athlete's profile."""
-    if not agent:
-        raise HTTPException(status_code=500, detail="Agent not initialized")
-    
-    # Check for authentication
-    if not user_sessions:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    
-    # Use the first available session
-    session_data = list(user_sessions.values())[0]
-    agent.set_strava_tokens(
-        session_data['access_token'],
-        session_data['refresh_token'],
-        session_data['expires_at']
-    )
-    
+@app.get("/api/athlete", response_model=None)
+def api_get_athlete(agent: StravaActivityAgent = Depends(get_authed_agent)):
+    """Get the authenticated athlete's profile (a plain def, so the blocking Strava call runs in the threadpool)."""
     try:
         athlete = agent.get_athlete_profile()
-        return {"success": True, "athlete": athlete}
+        return ORJSONResponse({"success": True, "athlete": athlete})
     except Exception as e:
-        logger.error(f"Failed to get athlete: {e}")
+        logger.error("Failed to get athlete: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Circuit Breaker
+
+This module provides a circuit breaker that stops calling a failing service for a
+while, so callers fail fast to their fallbacks instead of each waiting out
+timeouts and retries during an outage.
+"""
+
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        """
+        Initialize the exception.
+
+        Args:
+            retry_after: Seconds until a trial call will be allowed
+        """
+        super().__init__(f"Circuit open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker that opens after consecutive failures."""
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            fail_max: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before one trial call is let through
+        """
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The circuit state: "closed", "open" or "half-open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def before_call(self):
+        """
+        Check that a call may be made.
+
+        Once the reset timeout has passed, a single trial call is allowed; its outcome
+        closes the circuit again or keeps it open for another reset timeout. A trial whose
+        outcome is never recorded (e.g. a cancelled call) is replaced after reset_timeout.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            remaining = self._opened_at + self.reset_timeout - now
+            if remaining > 0:
+                raise CircuitOpenError(remaining)
+            if self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout:
+                raise CircuitOpenError(self._trial_started_at + self.reset_timeout - now)
+            self._trial_started_at = now
+
+    def record_success(self):
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self):
+        """Record a failed call, opening the circuit once too many have failed in a row."""
+        with self._lock:
+            self._failures += 1
+            self._trial_started_at = None
+            if self._opened_at is not None or self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
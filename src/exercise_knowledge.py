@@ -6,79 +6,351 @@ and fitness knowledge to enhance activity parsing and suggestions.
 """
 
 import os
+import atexit
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import re
+import threading
+from enum import Enum
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any
+from urllib.parse import urlsplit
 import weaviate
 from weaviate.classes.init import Auth
+from weaviate.classes.query import Filter, MetadataQuery
 import json
 
+from .query_cache import QueryCache
+
+# Optional: local embeddings for nearVector search
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
 logger = logging.getLogger(__name__)
 
+# Exercise properties projected into search results
+_EXERCISE_PROPERTIES = (
+    "name", "sport_type", "synonyms", "description", "muscle_groups",
+    "equipment", "intensity_level", "location_types", "keywords"
+)
+
+# Exercise properties projected into suggestions
+_SUGGESTION_PROPERTIES = ("name", "description", "keywords", "equipment", "location_types")
+
+# Exercise properties selected by the raw GraphQL batch queries
+_EXERCISE_FIELDS = " ".join(_EXERCISE_PROPERTIES)
+_SUGGESTION_FIELDS = " ".join(_SUGGESTION_PROPERTIES)
+
+class SportType(str, Enum):
+    """Strava sport types covered by the seed data."""
+    
+    RUN = "Run"
+    RIDE = "Ride"
+    SWIM = "Swim"
+    WEIGHT_TRAINING = "WeightTraining"
+    YOGA = "Yoga"
+    HIKE = "Hike"
+    WALK = "Walk"
+    ROWING = "Rowing"
+    
+    def __str__(self) -> str:
+        return self.value
+
+class IntensityLevel(str, Enum):
+    """Typical exercise intensity."""
+    
+    LOW = "low"
+    MODERATE = "moderate"
+    HIGH = "high"
+    VARIABLE = "variable"
+    
+    def __str__(self) -> str:
+        return self.value
+
+# Seed data loaded into an empty Exercise collection (read-only, shared by the in-memory lookups;
+# list fields are stored as tuples so results handed out can't alter the shared seed)
+_EXERCISE_SEED = tuple(MappingProxyType({
+    key: tuple(value) if isinstance(value, list) else value for key, value in exercise.items()
+}) for exercise in [
+    {
+        "name": "Running",
+        "sport_type": SportType.RUN,
+        "synonyms": ["jogging", "sprinting", "trail running", "road running", "treadmill running"],
+        "description": "Cardiovascular exercise involving rapid foot movement",
+        "muscle_groups": ["legs", "core", "cardiovascular"],
+        "equipment": ["running shoes", "treadmill", "track"],
+        "intensity_level": IntensityLevel.VARIABLE,
+        "location_types": ["outdoor", "gym", "track", "trail", "park"],
+        "keywords": ["cardio", "endurance", "pace", "distance", "marathon", "5k", "10k"]
+    },
+    {
+        "name": "Cycling",
+        "sport_type": SportType.RIDE,
+        "synonyms": ["biking", "road cycling", "mountain biking", "spinning", "indoor cycling"],
+        "description": "Pedaling a bicycle for exercise and transportation",
+        "muscle_groups": ["legs", "core", "cardiovascular"],
+        "equipment": ["bicycle", "helmet", "cycling shoes", "spin bike"],
+        "intensity_level": IntensityLevel.VARIABLE,
+        "location_types": ["outdoor", "gym", "road", "trail", "mountain"],
+        "keywords": ["pedaling", "gear", "cadence", "hills", "speed", "distance"]
+    },
+    {
+        "name": "Swimming",
+        "sport_type": SportType.SWIM,
+        "synonyms": ["freestyle", "backstroke", "breaststroke", "butterfly", "laps"],
+        "description": "Aquatic exercise using arm and leg movements",
+        "muscle_groups": ["full body", "arms", "legs", "core", "cardiovascular"],
+        "equipment": ["swimsuit", "goggles", "pool", "fins"],
+        "intensity_level": IntensityLevel.VARIABLE,
+        "location_types": ["pool", "ocean", "lake", "indoor pool", "outdoor pool"],
+        "keywords": ["laps", "stroke", "water", "aquatic", "endurance"]
+    },
+    {
+        "name": "Weight Training",
+        "sport_type": SportType.WEIGHT_TRAINING,
+        "synonyms": ["strength training", "resistance training", "lifting", "bodybuilding", "powerlifting"],
+        "description": "Exercise using weights to build strength and muscle",
+        "muscle_groups": ["variable", "arms", "legs", "chest", "back", "shoulders"],
+        "equipment": ["dumbbells", "barbells", "machines", "plates", "bench"],
+        "intensity_level": IntensityLevel.HIGH,
+        "location_types": ["gym", "home gym", "fitness center"],
+        "keywords": ["reps", "sets", "weight", "muscle", "strength", "gains", "iron"]
+    },
+    {
+        "name": "Yoga",
+        "sport_type": SportType.YOGA,
+        "synonyms": ["hot yoga", "vinyasa", "hatha", "bikram", "power yoga", "stretching"],
+        "description": "Mind-body practice combining poses, breathing, and meditation",
+        "muscle_groups": ["full body", "core", "flexibility"],
+        "equipment": ["yoga mat", "blocks", "straps"],
+        "intensity_level": IntensityLevel.VARIABLE,
+        "location_types": ["studio", "home", "park", "beach"],
+        "keywords": ["poses", "asanas", "flexibility", "mindfulness", "balance", "meditation"]
+    },
+    {
+        "name": "Hiking",
+        "sport_type": SportType.HIKE,
+        "synonyms": ["trekking", "trail walking", "mountain hiking", "nature walking"],
+        "description": "Walking in natural environments, often on trails",
+        "muscle_groups": ["legs", "core", "cardiovascular"],
+        "equipment": ["hiking boots", "backpack", "poles", "water"],
+        "intensity_level": IntensityLevel.VARIABLE,
+        "location_types": ["trail", "mountain", "forest", "park", "nature"],
+        "keywords": ["trail", "elevation", "nature", "outdoor", "adventure", "summit"]
+    },
+    {
+        "name": "Walking",
+        "sport_type": SportType.WALK,
+        "synonyms": ["power walking", "speed walking", "casual walking", "strolling"],
+        "description": "Basic locomotion exercise at various intensities",
+        "muscle_groups": ["legs", "cardiovascular"],
+        "equipment": ["walking shoes", "comfortable clothing"],
+        "intensity_level": IntensityLevel.LOW,
+        "location_types": ["anywhere", "park", "neighborhood", "treadmill"],
+        "keywords": ["steps", "pace", "casual", "leisure", "recovery"]
+    },
+    {
+        "name": "Rowing",
+        "sport_type": SportType.ROWING,
+        "synonyms": ["crew", "sculling", "ergometer", "rowing machine"],
+        "description": "Full-body exercise using rowing motion",
+        "muscle_groups": ["full body", "back", "arms", "legs", "core"],
+        "equipment": ["rowing machine", "boat", "oars"],
+        "intensity_level": IntensityLevel.HIGH,
+        "location_types": ["gym", "water", "indoor"],
+        "keywords": ["stroke", "catch", "drive", "recovery", "split time"]
+    }
+])
+
+# Bump when _EXERCISE_SEED changes so running processes re-check the collection
+_SEED_VERSION = 1
+
+# Suggestions for the seeded sport types, served without a Weaviate round-trip (copied per call)
+_SEED_SUGGESTIONS = {
+    exercise["sport_type"].lower(): {
+        "name": exercise["name"],
+        "description": exercise["description"],
+        "keywords": exercise["keywords"],
+        "equipment": exercise["equipment"],
+        "location_types": exercise["location_types"]
+    }
+    for exercise in _EXERCISE_SEED
+}
+
+# Lowercased equipment words per seeded sport type, for matching against locations
+_SEED_EQUIPMENT_TOKENS = {
+    exercise["sport_type"].lower(): [
+        (equip, frozenset(equip.lower().split())) for equip in exercise["equipment"]
+    ]
+    for exercise in _EXERCISE_SEED
+}
+
+def _build_keyword_index() -> Dict[str, List[int]]:
+    """Map each lowercased word of the seed names, synonyms and keywords to its seed rows."""
+    index: Dict[str, List[int]] = {}
+    for row, exercise in enumerate(_EXERCISE_SEED):
+        terms = [exercise["name"], exercise["sport_type"], *exercise["synonyms"], *exercise["keywords"]]
+        words = {word for term in terms for word in re.findall(r"\w+", term.lower())}
+        for word in words:
+            index.setdefault(word, []).append(row)
+    return index
+
+_SEED_KEYWORD_INDEX = _build_keyword_index()
+
+def _match_seed_keywords(query: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Answer a search from the seed keyword index without a Weaviate call.
+    
+    Only queries made up entirely of known exercise terms are answered here; a
+    query like "30 minute treadmill walk" needs the hybrid search to rank its
+    partial matches sensibly.
+    
+    Args:
+        query: Search query
+        limit: Maximum number of results to return
+        
+    Returns:
+        Seed exercises ranked by how many query words they match, or an empty
+        list unless every query word is a known exercise term
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words or not all(word in _SEED_KEYWORD_INDEX for word in words):
+        return []
+    
+    counts: Dict[int, int] = {}
+    for word in words:
+        for index in _SEED_KEYWORD_INDEX.get(word, ()):
+            counts[index] = counts.get(index, 0) + 1
+    
+    ranked = sorted(counts, key=lambda index: (-counts[index], index))[:limit]
+    return [
+        ExerciseKnowledgeBase._to_search_result(_EXERCISE_SEED[index], counts[index] / len(words))
+        for index in ranked
+    ]
+
+def _plain_value(value: Any) -> Any:
+    """Convert a seed value to the type Weaviate stores and returns (enums to strings, tuples to lists)."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+def _to_properties(exercise: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert a seed exercise to a plain dict of Weaviate property values."""
+    return {key: _plain_value(value) for key, value in exercise.items()}
+
+def _normalize_query(query: str) -> str:
+    """Normalize case and whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
 class ExerciseKnowledgeBase:
     """Weaviate-powered exercise knowledge base for semantic search."""
     
-    def __init__(self, weaviate_url: Optional[str] = None, api_key: Optional[str] = None):
+    # Weaviate URLs whose Exercise collection has been checked in this process
+    _schema_ready = set()
+    
+    # (Weaviate URL, seed version) pairs known to hold the seed data in this process
+    _seeded = set()
+    
+    def __init__(
+        self,
+        weaviate_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache_config: Optional[Dict[str, Any]] = None,
+        embedding_model: Optional[str] = None,
+        warmup: bool = False
+    ):
         """
         Initialize the Exercise Knowledge Base.
         
         Args:
             weaviate_url: Weaviate instance URL (defaults to local)
             api_key: Weaviate API key for cloud instances
+            cache_config: Query cache settings (max_size, ttl_seconds, enabled)
+            embedding_model: sentence-transformers model used to embed queries locally
+                (defaults to EXERCISE_EMBEDDING_MODEL env var; disabled if unset)
+            warmup: Issue a cheap query after connecting so the first real search isn't cold
         """
         self.weaviate_url = weaviate_url or os.getenv('WEAVIATE_URL', 'http://localhost:8081')
         self.api_key = api_key or os.getenv('WEAVIATE_API_KEY')
+        self.embedding_model = embedding_model or os.getenv('EXERCISE_EMBEDDING_MODEL')
         
+        self.embedder = None
+        if self.embedding_model:
+            if SentenceTransformer is None:
+                logger.warning("sentence-transformers is not installed. Local embeddings disabled.")
+            else:
+                self.embedder = SentenceTransformer(self.embedding_model)
+        
+        cache_settings = {"max_size": 2000, "ttl_seconds": 600, "enabled": True}
+        cache_settings.update(cache_config or {})
+        self.cache = QueryCache(**cache_settings)
+        
+        self._client = None
+        self._connected = False
+        self._exercise_collection = None
+        self._local_index = None
+        self._connect_lock = threading.Lock()
+        
+        if warmup:
+            self.warmup()
+    
+    @property
+    def client(self):
+        """Weaviate client, connected on first use (None if Weaviate is unavailable)."""
+        if not self._connected:
+            with self._connect_lock:
+                if not self._connected:
+                    self._connect()
+                    self._connected = True
+        return self._client
+    
+    def _connect(self):
+        """Connect to Weaviate and make sure the exercise collection is ready."""
         try:
             # Initialize Weaviate client
             if self.api_key:
-                self.client = weaviate.connect_to_weaviate_cloud(
+                self._client = weaviate.connect_to_weaviate_cloud(
                     cluster_url=self.weaviate_url,
                     auth_credentials=Auth.api_key(self.api_key)
                 )
             else:
                 # Parse the URL to extract just the host and port
-                if self.weaviate_url.startswith('http://'):
-                    host_part = self.weaviate_url.replace('http://', '')
-                elif self.weaviate_url.startswith('https://'):
-                    host_part = self.weaviate_url.replace('https://', '')
-                else:
-                    host_part = self.weaviate_url
-                
-                # Split host and port if present
-                if ':' in host_part:
-                    host, port = host_part.split(':')
-                    port = int(port)
-                else:
-                    host = host_part
-                    port = 8080
-                
-                self.client = weaviate.connect_to_local(host=host, port=port)
+                url = urlsplit(self.weaviate_url if "://" in self.weaviate_url else f"http://{self.weaviate_url}")
+                self._client = weaviate.connect_to_local(host=url.hostname or "localhost", port=url.port or 8080)
             
             logger.info("Connected to Weaviate successfully")
             
-            # Initialize the exercise schema
-            self._setup_schema()
+            # Initialize the exercise schema (once per Weaviate instance per process)
+            if self.weaviate_url not in ExerciseKnowledgeBase._schema_ready:
+                self._setup_schema()
+                ExerciseKnowledgeBase._schema_ready.add(self.weaviate_url)
+            
+            self._exercise_collection = self._client.collections.get("Exercise")
             
             # Populate with initial exercise data if empty
             self._populate_initial_data()
             
         except Exception as e:
-            logger.warning(f"Failed to connect to Weaviate: {e}. Exercise knowledge features disabled.")
-            self.client = None
+            logger.warning("Failed to connect to Weaviate: %s. Exercise knowledge features disabled.", e)
+            self._client = None
     
     def _setup_schema(self):
         """Set up the exercise knowledge schema in Weaviate."""
-        if not self.client:
+        if not self._client:
             return
             
         try:
             # Check if collection already exists
-            if self.client.collections.exists("Exercise"):
+            if self._client.collections.exists("Exercise"):
                 logger.info("Exercise collection already exists")
                 return
             
             # Create Exercise collection
-            exercise_collection = self.client.collections.create(
+            exercise_collection = self._client.collections.create(
                 name="Exercise",
                 description="Exercise and fitness activity knowledge base",
                 properties=[
@@ -130,125 +402,59 @@ class ExerciseKnowledgeBase:
                 ]
             )
             
+            self.cache.clear()
             logger.info("Exercise collection created successfully")
             
         except Exception as e:
-            logger.error(f"Failed to set up Weaviate schema: {e}")
+            logger.error("Failed to set up Weaviate schema: %s", e)
     
     def _populate_initial_data(self):
         """Populate the knowledge base with initial exercise data."""
-        if not self.client:
+        if not self._client:
+            return
+        
+        seed_key = (self.weaviate_url, _SEED_VERSION)
+        if seed_key in ExerciseKnowledgeBase._seeded:
             return
             
         try:
-            collection = self.client.collections.get("Exercise")
+            collection = self._exercise_collection
             
             # Check if data already exists
             if collection.aggregate.over_all(total_count=True).total_count > 0:
                 logger.info("Exercise data already exists")
+                ExerciseKnowledgeBase._seeded.add(seed_key)
                 return
             
-            # Initial exercise data
-            exercises = [
-                {
-                    "name": "Running",
-                    "sport_type": "Run",
-                    "synonyms": ["jogging", "sprinting", "trail running", "road running", "treadmill running"],
-                    "description": "Cardiovascular exercise involving rapid foot movement",
-                    "muscle_groups": ["legs", "core", "cardiovascular"],
-                    "equipment": ["running shoes", "treadmill", "track"],
-                    "intensity_level": "variable",
-                    "location_types": ["outdoor", "gym", "track", "trail", "park"],
-                    "keywords": ["cardio", "endurance", "pace", "distance", "marathon", "5k", "10k"]
-                },
-                {
-                    "name": "Cycling",
-                    "sport_type": "Ride",
-                    "synonyms": ["biking", "road cycling", "mountain biking", "spinning", "indoor cycling"],
-                    "description": "Pedaling a bicycle for exercise and transportation",
-                    "muscle_groups": ["legs", "core", "cardiovascular"],
-                    "equipment": ["bicycle", "helmet", "cycling shoes", "spin bike"],
-                    "intensity_level": "variable",
-                    "location_types": ["outdoor", "gym", "road", "trail", "mountain"],
-                    "keywords": ["pedaling", "gear", "cadence", "hills", "speed", "distance"]
-                },
-                {
-                    "name": "Swimming",
-                    "sport_type": "Swim",
-                    "synonyms": ["freestyle", "backstroke", "breaststroke", "butterfly", "laps"],
-                    "description": "Aquatic exercise using arm and leg movements",
-                    "muscle_groups": ["full body", "arms", "legs", "core", "cardiovascular"],
-                    "equipment": ["swimsuit", "goggles", "pool", "fins"],
-                    "intensity_level": "variable",
-                    "location_types": ["pool", "ocean", "lake", "indoor pool", "outdoor pool"],
-                    "keywords": ["laps", "stroke", "water", "aquatic", "endurance"]
-                },
-                {
-                    "name": "Weight Training",
-                    "sport_type": "WeightTraining",
-                    "synonyms": ["strength training", "resistance training", "lifting", "bodybuilding", "powerlifting"],
-                    "description": "Exercise using weights to build strength and muscle",
-                    "muscle_groups": ["variable", "arms", "legs", "chest", "back", "shoulders"],
-                    "equipment": ["dumbbells", "barbells", "machines", "plates", "bench"],
-                    "intensity_level": "high",
-                    "location_types": ["gym", "home gym", "fitness center"],
-                    "keywords": ["reps", "sets", "weight", "muscle", "strength", "gains", "iron"]
-                },
-                {
-                    "name": "Yoga",
-                    "sport_type": "Yoga",
-                    "synonyms": ["hot yoga", "vinyasa", "hatha", "bikram", "power yoga", "stretching"],
-                    "description": "Mind-body practice combining poses, breathing, and meditation",
-                    "muscle_groups": ["full body", "core", "flexibility"],
-                    "equipment": ["yoga mat", "blocks", "straps"],
-                    "intensity_level": "variable",
-                    "location_types": ["studio", "home", "park", "beach"],
-                    "keywords": ["poses", "asanas", "flexibility", "mindfulness", "balance", "meditation"]
-                },
-                {
-                    "name": "Hiking",
-                    "sport_type": "Hike",
-                    "synonyms": ["trekking", "trail walking", "mountain hiking", "nature walking"],
-                    "description": "Walking in natural environments, often on trails",
-                    "muscle_groups": ["legs", "core", "cardiovascular"],
-                    "equipment": ["hiking boots", "backpack", "poles", "water"],
-                    "intensity_level": "variable",
-                    "location_types": ["trail", "mountain", "forest", "park", "nature"],
-                    "keywords": ["trail", "elevation", "nature", "outdoor", "adventure", "summit"]
-                },
-                {
-                    "name": "Walking",
-                    "sport_type": "Walk",
-                    "synonyms": ["power walking", "speed walking", "casual walking", "strolling"],
-                    "description": "Basic locomotion exercise at various intensities",
-                    "muscle_groups": ["legs", "cardiovascular"],
-                    "equipment": ["walking shoes", "comfortable clothing"],
-                    "intensity_level": "low",
-                    "location_types": ["anywhere", "park", "neighborhood", "treadmill"],
-                    "keywords": ["steps", "pace", "casual", "leisure", "recovery"]
-                },
-                {
-                    "name": "Rowing",
-                    "sport_type": "Rowing",
-                    "synonyms": ["crew", "sculling", "ergometer", "rowing machine"],
-                    "description": "Full-body exercise using rowing motion",
-                    "muscle_groups": ["full body", "back", "arms", "legs", "core"],
-                    "equipment": ["rowing machine", "boat", "oars"],
-                    "intensity_level": "high",
-                    "location_types": ["gym", "water", "indoor"],
-                    "keywords": ["stroke", "catch", "drive", "recovery", "split time"]
-                }
-            ]
+            # Embed all exercises in one pass so nearVector queries have vectors to match
+            vectors = [None] * len(_EXERCISE_SEED)
+            if self.embedder:
+                vectors = self.embed_many([self._embedding_text(exercise) for exercise in _EXERCISE_SEED])
             
-            # Insert exercise data
-            with collection.batch.dynamic() as batch:
-                for exercise in exercises:
-                    batch.add_object(exercise)
+            # Insert exercise data in fixed-size batches sent over parallel requests
+            objects = list(zip(_EXERCISE_SEED, vectors))
+            with collection.batch.fixed_size(batch_size=min(100, len(objects)), concurrent_requests=2) as batch:
+                for exercise, vector in objects:
+                    batch.add_object(_to_properties(exercise), vector=vector)
             
-            logger.info(f"Populated knowledge base with {len(exercises)} exercises")
+            self.cache.clear()
+            ExerciseKnowledgeBase._seeded.add(seed_key)
+            logger.info("Populated knowledge base with %d exercises", len(_EXERCISE_SEED))
             
         except Exception as e:
-            logger.error(f"Failed to populate exercise data: {e}")
+            logger.error("Failed to populate exercise data: %s", e)
+    
+    def warmup(self):
+        """Run a single cheap query so Weaviate loads its index before the first real search."""
+        if not self.client:
+            return
+        
+        try:
+            collection = self._exercise_collection
+            collection.query.hybrid(query="warmup", limit=1)
+            logger.info("Exercise index warmed up")
+        except Exception as e:
+            logger.debug("Exercise index warmup failed: %s", e)
     
     def search_exercises(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -261,43 +467,224 @@ class ExerciseKnowledgeBase:
         Returns:
             List of matching exercises with similarity scores
         """
+        # Queries made up only of known exercise terms are answered from the seed index
+        keyword_matches = _match_seed_keywords(query, limit)
+        if keyword_matches:
+            return keyword_matches
+        
         if not self.client:
+            if self.embedder:
+                return self._search_local(self.embed_many([query])[0], limit)
             logger.warning("Weaviate not available, returning empty results")
             return []
         
+        cache_key = ("search_exercises", _normalize_query(query), limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            collection = self.client.collections.get("Exercise")
+            collection = self._exercise_collection
             
             # Perform hybrid search (keyword + semantic)
             response = collection.query.hybrid(
                 query=query,
                 limit=limit,
-                return_metadata=["score"]
+                return_properties=list(_EXERCISE_PROPERTIES),
+                return_metadata=MetadataQuery(score=True)
+            )
+            
+            to_result = self._to_search_result
+            results = [
+                to_result(obj.properties, getattr(obj.metadata, 'score', None) or 0.0)
+                for obj in response.objects
+            ]
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Found %d exercise matches for query: %s", len(results), query)
+            self.cache.put(cache_key, results)
+            return results
+            
+        except Exception as e:
+            logger.error("Failed to search exercises: %s", e)
+            return []
+    
+    async def search_exercises_async(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search for exercises without blocking the event loop.
+        
+        Args:
+            query: Search query (exercise description, keywords, etc.)
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of matching exercises with similarity scores
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.search_exercises, query, limit)
+    
+    def search_exercises_batch(self, queries: List[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries in a single Weaviate round-trip.
+        
+        All queries are sent as aliased hybrid searches inside one GraphQL
+        ``Get`` request instead of one request per query.
+        
+        Args:
+            queries: Search queries (exercise descriptions, keywords, etc.)
+            limit: Maximum number of results to return per query
+            
+        Returns:
+            One list of matching exercises per query, in the same order as ``queries``
+        """
+        all_results = [
+            _match_seed_keywords(query, limit) or self.cache.get(("search_exercises", _normalize_query(query), limit))
+            for query in queries
+        ]
+        if not self.client:
+            return [results or [] for results in all_results]
+        
+        missing = [i for i, results in enumerate(all_results) if results is None]
+        if not missing:
+            return all_results
+        
+        try:
+            selections = "\n".join(
+                f"q{i}: Exercise(hybrid: {{query: {json.dumps(queries[i])}}}, limit: {int(limit)}) "
+                f"{{ {_EXERCISE_FIELDS} _additional {{ score }} }}"
+                for i in missing
+            )
+            response = self.client.graphql_raw_query(f"{{ Get {{ {selections} }} }}")
+            if response.errors:
+                raise Exception(response.errors)
+            
+            for i in missing:
+                results = []
+                for obj in (response.get or {}).get(f"q{i}") or []:
+                    additional = obj.get("_additional") or {}
+                    results.append(self._to_search_result(obj, float(additional.get("score") or 0.0)))
+                all_results[i] = results
+                self.cache.put(("search_exercises", _normalize_query(queries[i]), limit), results)
+            
+            logger.info("Batched %d exercise searches into a single request", len(missing))
+            return all_results
+            
+        except Exception as e:
+            logger.error("Failed to batch search exercises: %s", e)
+            return [results or [] for results in all_results]
+    
+    async def search_exercises_batch_async(self, queries: List[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries in a single Weaviate round-trip without blocking the event loop.
+        
+        Args:
+            queries: Search queries (exercise descriptions, keywords, etc.)
+            limit: Maximum number of results to return per query
+            
+        Returns:
+            One list of matching exercises per query, in the same order as ``queries``
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.search_exercises_batch, queries, limit)
+    
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts locally in a single batched forward pass.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One normalized embedding per text
+            
+        Raises:
+            RuntimeError: If no embedding model is configured
+        """
+        if not self.embedder:
+            raise RuntimeError("No embedding model configured. Set EXERCISE_EMBEDDING_MODEL.")
+        
+        vectors = self.embedder.encode(
+            texts,
+            batch_size=max(len(texts), 1),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return vectors.tolist()
+    
+    def search_exercises_by_vector(self, vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search for exercises near a precomputed query embedding.
+        
+        Args:
+            vector: Query embedding (see embed_many)
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of matching exercises with similarity scores
+        """
+        if not self.client:
+            if self.embedder:
+                return self._search_local(vector, limit)
+            logger.warning("Weaviate not available, returning empty results")
+            return []
+        
+        try:
+            collection = self._exercise_collection
+            
+            response = collection.query.near_vector(
+                near_vector=vector,
+                limit=limit,
+                return_properties=list(_EXERCISE_PROPERTIES),
+                return_metadata=MetadataQuery(distance=True)
             )
             
             results = []
             for obj in response.objects:
-                result = {
-                    "name": obj.properties.get("name"),
-                    "sport_type": obj.properties.get("sport_type"),
-                    "synonyms": obj.properties.get("synonyms", []),
-                    "description": obj.properties.get("description"),
-                    "muscle_groups": obj.properties.get("muscle_groups", []),
-                    "equipment": obj.properties.get("equipment", []),
-                    "intensity_level": obj.properties.get("intensity_level"),
-                    "location_types": obj.properties.get("location_types", []),
-                    "keywords": obj.properties.get("keywords", []),
-                    "score": obj.metadata.score if hasattr(obj.metadata, 'score') else 0.0
-                }
-                results.append(result)
-            
-            logger.info(f"Found {len(results)} exercise matches for query: {query}")
+                distance = getattr(obj.metadata, 'distance', None)
+                score = 1.0 - distance if distance is not None else 0.0
+                results.append(self._to_search_result(obj.properties, score))
+            
             return results
             
         except Exception as e:
-            logger.error(f"Failed to search exercises: {e}")
+            logger.error("Failed to search exercises by vector: %s", e)
             return []
     
+    def _search_local(self, vector: List[float], limit: int) -> List[Dict[str, Any]]:
+        """Search the seed exercises in memory when Weaviate is unavailable."""
+        if self._local_index is None:
+            from .local_index import LocalVectorIndex
+            
+            vectors = self.embed_many([self._embedding_text(exercise) for exercise in _EXERCISE_SEED])
+            self._local_index = LocalVectorIndex(_EXERCISE_SEED, vectors)
+            logger.info("Weaviate not available, using local exercise index")
+        
+        return [self._to_search_result(row, score) for row, score in self._local_index.search(vector, limit)]
+    
+    @staticmethod
+    def _embedding_text(exercise: Mapping[str, Any]) -> str:
+        """Build the text embedded for an exercise."""
+        return " ".join([
+            exercise["name"],
+            exercise["description"],
+            *exercise.get("synonyms", ()),
+            *exercise.get("keywords", ())
+        ])
+    
+    @staticmethod
+    def _to_search_result(properties: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """Build a search result dictionary from exercise properties (Weaviate or seed)."""
+        return {
+            "name": properties.get("name"),
+            "sport_type": _plain_value(properties.get("sport_type")),
+            "synonyms": _plain_value(properties.get("synonyms")) or [],
+            "description": properties.get("description"),
+            "muscle_groups": _plain_value(properties.get("muscle_groups")) or [],
+            "equipment": _plain_value(properties.get("equipment")) or [],
+            "intensity_level": _plain_value(properties.get("intensity_level")),
+            "location_types": _plain_value(properties.get("location_types")) or [],
+            "keywords": _plain_value(properties.get("keywords")) or [],
+            "score": score
+        }
+    
     def get_exercise_suggestions(self, sport_type: str) -> List[Dict[str, Any]]:
         """
         Get exercise suggestions for a specific sport type.
@@ -308,35 +695,89 @@ class ExerciseKnowledgeBase:
         Returns:
             List of exercises matching the sport type
         """
+        seeded = _SEED_SUGGESTIONS.get(sport_type.lower())
+        if seeded:
+            return [{key: _plain_value(value) for key, value in seeded.items()}]
+        
         if not self.client:
             return []
         
+        cache_key = ("get_exercise_suggestions", sport_type, 10)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            collection = self.client.collections.get("Exercise")
+            collection = self._exercise_collection
             
-            response = collection.query.where(
-                ["sport_type"],
-                ["Equal", sport_type],
-                limit=10
+            response = collection.query.fetch_objects(
+                filters=Filter.by_property("sport_type").equal(sport_type),
+                limit=10,
+                return_properties=list(_SUGGESTION_PROPERTIES)
             )
             
-            suggestions = []
-            for obj in response.objects:
-                suggestion = {
-                    "name": obj.properties.get("name"),
-                    "description": obj.properties.get("description"),
-                    "keywords": obj.properties.get("keywords", []),
-                    "equipment": obj.properties.get("equipment", []),
-                    "location_types": obj.properties.get("location_types", [])
-                }
-                suggestions.append(suggestion)
-            
+            suggestions = [self._to_suggestion(obj.properties) for obj in response.objects]
+            self.cache.put(cache_key, suggestions)
             return suggestions
             
         except Exception as e:
-            logger.error(f"Failed to get exercise suggestions: {e}")
+            logger.error("Failed to get exercise suggestions: %s", e)
             return []
     
+    def get_exercise_suggestions_batch(self, sport_types: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Get exercise suggestions for several sport types in a single Weaviate round-trip.
+        
+        Args:
+            sport_types: Strava sport types
+            
+        Returns:
+            One list of suggestions per sport type, in the same order as ``sport_types``
+        """
+        all_suggestions = [
+            self.get_exercise_suggestions(sport_type) if sport_type.lower() in _SEED_SUGGESTIONS
+            else self.cache.get(("get_exercise_suggestions", sport_type, 10))
+            for sport_type in sport_types
+        ]
+        if not self.client:
+            return [suggestions or [] for suggestions in all_suggestions]
+        
+        missing = [i for i, suggestions in enumerate(all_suggestions) if suggestions is None]
+        if not missing:
+            return all_suggestions
+        
+        try:
+            selections = "\n".join(
+                f"s{i}: Exercise(where: {{path: [\"sport_type\"], operator: Equal, valueText: {json.dumps(sport_types[i])}}}, limit: 10) "
+                f"{{ {_SUGGESTION_FIELDS} }}"
+                for i in missing
+            )
+            response = self.client.graphql_raw_query(f"{{ Get {{ {selections} }} }}")
+            if response.errors:
+                raise Exception(response.errors)
+            
+            for i in missing:
+                suggestions = [self._to_suggestion(obj) for obj in (response.get or {}).get(f"s{i}") or []]
+                all_suggestions[i] = suggestions
+                self.cache.put(("get_exercise_suggestions", sport_types[i], 10), suggestions)
+            
+            return all_suggestions
+            
+        except Exception as e:
+            logger.error("Failed to batch get exercise suggestions: %s", e)
+            return [suggestions or [] for suggestions in all_suggestions]
+    
+    @staticmethod
+    def _to_suggestion(properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a suggestion dictionary from exercise properties."""
+        return {
+            "name": properties.get("name"),
+            "description": properties.get("description"),
+            "keywords": properties.get("keywords") or [],
+            "equipment": properties.get("equipment") or [],
+            "location_types": properties.get("location_types") or []
+        }
+    
     def enhance_activity_context(self, sport_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enhance activity context with exercise knowledge.
@@ -348,54 +789,144 @@ class ExerciseKnowledgeBase:
         Returns:
             Enhanced context with additional exercise information
         """
-        if not self.client:
-            return context
-        
         try:
-            # Get exercise information
-            suggestions = self.get_exercise_suggestions(sport_type)
-            
-            if suggestions:
-                exercise = suggestions[0]  # Use the first/best match
-                
-                # Enhance context with exercise knowledge
-                enhanced_context = context.copy()
-                
-                # Add exercise-specific keywords if not already present
-                if not enhanced_context.get("keywords"):
-                    enhanced_context["exercise_keywords"] = exercise.get("keywords", [])
-                
-                # Add equipment information if location suggests it
-                if enhanced_context.get("location") and exercise.get("equipment"):
-                    location = enhanced_context["location"].lower()
-                    equipment = exercise.get("equipment", [])
-                    
-                    # Try to match location with equipment
-                    for equip in equipment:
-                        if any(word in location for word in equip.lower().split()):
-                            enhanced_context["equipment"] = equip
-                            break
-                
-                # Add muscle group information for better descriptions
-                enhanced_context["muscle_groups"] = exercise.get("muscle_groups", [])
-                
-                # Add intensity information if not present
-                if not enhanced_context.get("intensity"):
-                    enhanced_context["intensity"] = exercise.get("intensity_level")
-                
-                logger.info(f"Enhanced context for {sport_type} with exercise knowledge")
-                return enhanced_context
+            location = context.get("location") or ""
+            has_keywords = bool(context.get("keywords"))
+            has_intensity = bool(context.get("intensity"))
+            
+            # Only these inputs affect the result, so the additions are cached on them
+            cache_key = ("enhance_activity_context", sport_type, location, has_keywords, has_intensity)
+            additions = self.cache.get(cache_key)
+            if additions is None:
+                additions = self._context_additions(sport_type, location, has_keywords, has_intensity)
+                if additions:
+                    self.cache.put(cache_key, additions)
+            
+            if additions:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Enhanced context for %s with exercise knowledge", sport_type)
+                return {**context, **additions}
             
         except Exception as e:
-            logger.error(f"Failed to enhance activity context: {e}")
+            logger.error("Failed to enhance activity context: %s", e)
         
         return context
     
+    async def enhance_activity_context_async(self, sport_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enhance activity context with exercise knowledge without blocking the event loop.
+        
+        Args:
+            sport_type: Type of sport/exercise
+            context: Existing context dictionary
+            
+        Returns:
+            Enhanced context with additional exercise information
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.enhance_activity_context, sport_type, context
+        )
+    
+    def _context_additions(
+        self,
+        sport_type: str,
+        location: str,
+        has_keywords: bool,
+        has_intensity: bool
+    ) -> Dict[str, Any]:
+        """Build the exercise knowledge keys added to an activity context (empty if unknown sport)."""
+        # Get exercise information
+        suggestions = self.get_exercise_suggestions(sport_type)
+        if not suggestions:
+            return {}
+        
+        exercise = suggestions[0]  # Use the first/best match
+        additions = {}
+        
+        # Add exercise-specific keywords if not already present
+        if not has_keywords:
+            additions["exercise_keywords"] = exercise.get("keywords", [])
+        
+        # Add equipment information if location suggests it
+        if location and exercise.get("equipment"):
+            location_words = set(re.findall(r"\w+", location.lower()))
+            equipment_tokens = _SEED_EQUIPMENT_TOKENS.get(sport_type.lower()) or [
+                (equip, frozenset(equip.lower().split())) for equip in exercise["equipment"]
+            ]
+            
+            # Try to match location with equipment
+            for equip, tokens in equipment_tokens:
+                if location_words & tokens:
+                    additions["equipment"] = equip
+                    break
+        
+        # Add muscle group information for better descriptions
+        additions["muscle_groups"] = exercise.get("muscle_groups", [])
+        
+        # Add intensity information if not present
+        if not has_intensity:
+            additions["intensity"] = exercise.get("intensity_level")
+        
+        return additions
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get query cache statistics.
+        
+        Returns:
+            Dictionary with size, hits, misses and hit_rate
+        """
+        return self.cache.stats()
+    
+    def __enter__(self) -> "ExerciseKnowledgeBase":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def __aenter__(self) -> "ExerciseKnowledgeBase":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def close(self):
-        """Close the Weaviate client connection."""
-        if self.client:
+        """Close the Weaviate client connection (safe to call more than once)."""
+        self.cache.clear()
+        client, self._client = self._client, None
+        self._exercise_collection = None
+        if client:
             try:
-                self.client.close()
+                client.close()
                 logger.info("Weaviate client connection closed")
             except Exception as e:
-                logger.error(f"Error closing Weaviate client: {e}")
\ No newline at end of file
+                logger.error("Error closing Weaviate client: %s", e)
+
+# Process-wide knowledge base configured from the environment
+_default_kb: Optional[ExerciseKnowledgeBase] = None
+_default_kb_lock = threading.Lock()
+
+def get_default_kb() -> ExerciseKnowledgeBase:
+    """
+    Get the shared knowledge base configured from WEAVIATE_URL / WEAVIATE_API_KEY.
+    
+    The instance (and its Weaviate connection and query cache) is created on first
+    call and closed automatically at interpreter exit.
+    
+    Returns:
+        The process-wide ExerciseKnowledgeBase
+    """
+    global _default_kb
+    if _default_kb is None:
+        with _default_kb_lock:
+            if _default_kb is None:
+                kb = ExerciseKnowledgeBase()
+                atexit.register(kb.close)
+                _default_kb = kb
+    return _default_kb
@@ -0,0 +1,61 @@
+"""
+Local Vector Index
+
+This module provides an in-memory similarity search over a small set of
+embedded rows, used to answer exercise searches when Weaviate is unavailable.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Optional: SIMD-accelerated similarity kernels
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+
+class LocalVectorIndex:
+    """Brute-force cosine similarity index over embeddings."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], vectors: Sequence[Sequence[float]]):
+        """
+        Initialize the index.
+
+        Args:
+            rows: Row data returned for matches
+            vectors: One embedding per row (normalized here)
+        """
+        self.rows = list(rows)
+        self.matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+    def search(self, vector: Sequence[float], limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the rows most similar to a query embedding.
+
+        Args:
+            vector: Query embedding
+            limit: Maximum number of results to return
+
+        Returns:
+            (row, cosine similarity) pairs, best match first
+        """
+        k = min(limit, len(self.rows))
+        if k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(vector, dtype=np.float32))
+        if simsimd is not None:
+            scores = 1.0 - np.asarray(simsimd.cdist(query[np.newaxis, :], self.matrix, metric="cosine"))[0]
+        else:
+            scores = self.matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.rows[i], float(scores[i])) for i in top]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale vectors (or a single vector) to unit length."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
@@ -0,0 +1,200 @@
+"""
+Prompt Cache
+
+This module caches parsed activity prompts so repeated or near-identical
+prompts can skip the Writer AI round trip. Exact repeats are matched on the
+normalized prompt text; when an embedding function is available, prompts whose
+embeddings are nearly identical are matched as well.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+class SemanticPromptCache:
+    """LRU cache of parse results with exact and embedding-similarity lookups."""
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+        max_size: int = 1000,
+        ttl_seconds: float = 300,
+        similarity_threshold: float = 0.95,
+        match_key: Optional[Callable[[str], Any]] = None
+    ):
+        """
+        Initialize the prompt cache.
+
+        Args:
+            embed: Function returning one normalized embedding per text; exact matching only if None
+            max_size: Maximum number of entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            match_key: Function of the normalized prompt whose value must also agree for a
+                semantic hit, e.g. the sport named in it
+        """
+        self.embed = embed
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.match_key = match_key
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        """Lower-case a prompt and collapse its whitespace."""
+        return " ".join(prompt.lower().split())
+
+    def _signature(self, key: str) -> tuple:
+        """The parts of a normalized prompt that must be equal for a semantic hit."""
+        return (_NUMBER_RE.findall(key), self.match_key(key) if self.match_key is not None else None)
+
+    def _find_exact(self, key: str) -> Tuple[Optional[Any], List[tuple]]:
+        """
+        Look up a normalized prompt exactly.
+
+        Returns:
+            The cached value (or None) and, on a miss, the live entries that may match semantically
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry[0]:
+                    self._entries.move_to_end(key)
+                    return entry[1], []
+                del self._entries[key]
+
+            if self.embed is None:
+                return None, []
+            signature = self._signature(key)
+            candidates = [
+                (candidate_key, vector)
+                for candidate_key, (expires_at, _, vector, candidate_signature) in self._entries.items()
+                if now < expires_at and candidate_signature == signature and vector is not None
+            ]
+        return None, candidates
+
+    def _embed_key(self, key: str, action: str) -> Optional[Sequence[float]]:
+        """Embed a normalized prompt, or None if the embedding fails."""
+        try:
+            return self.embed([key])[0]
+        except Exception as e:
+            logger.warning("Failed to embed prompt for cache %s: %s", action, e)
+            return None
+
+    def _find_similar(self, candidates: List[tuple], vector: Optional[Sequence[float]]) -> Optional[Any]:
+        """Get the value of the candidate most similar to the prompt embedding, if similar enough."""
+        if vector is None:
+            return None
+
+        import numpy as np
+
+        query = np.asarray(vector, dtype=np.float32)
+        scores = np.asarray([candidate_vector for _, candidate_vector in candidates], dtype=np.float32) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(candidates[best][0])
+            if entry is None:
+                return None
+            self._entries.move_to_end(candidates[best][0])
+            return entry[1]
+
+    def lookup(self, prompt: str) -> Optional[Any]:
+        """
+        Find a cached result for a prompt.
+
+        Semantic matches are only considered between prompts containing the same
+        numbers (and the same match_key value), so "30 min run" never reuses the
+        result for "45 min run".
+
+        Args:
+            prompt: Natural language prompt
+
+        Returns:
+            The cached value, or None if no live entry matches
+        """
+        key = self._normalize(prompt)
+        value, candidates = self._find_exact(key)
+        if not candidates:
+            return value
+        return self._find_similar(candidates, self._embed_key(key, "lookup"))
+
+    async def lookup_async(self, prompt: str) -> Optional[Any]:
+        """
+        Find a cached result for a prompt, embedding it in a worker thread.
+
+        Args:
+            prompt: Natural language prompt
+
+        Returns:
+            The cached value, or None if no live entry matches
+        """
+        key = self._normalize(prompt)
+        value, candidates = self._find_exact(key)
+        if not candidates:
+            return value
+        vector = await asyncio.get_running_loop().run_in_executor(None, self._embed_key, key, "lookup")
+        return self._find_similar(candidates, vector)
+
+    def _store(self, key: str, value: Any, vector: Optional[Sequence[float]]):
+        """Store an entry for a normalized prompt, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, vector, self._signature(key))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def insert(self, prompt: str, value: Any):
+        """
+        Store the result for a prompt, evicting the least recently used entry if full.
+
+        Args:
+            prompt: Natural language prompt
+            value: Parse result to cache
+        """
+        key = self._normalize(prompt)
+        vector = self._embed_key(key, "insert") if self.embed is not None else None
+        self._store(key, value, vector)
+
+    async def insert_async(self, prompt: str, value: Any):
+        """
+        Store the result for a prompt, embedding it in a worker thread.
+
+        Args:
+            prompt: Natural language prompt
+            value: Parse result to cache
+        """
+        key = self._normalize(prompt)
+        vector = None
+        if self.embed is not None:
+            vector = await asyncio.get_running_loop().run_in_executor(None, self._embed_key, key, "insert")
+        self._store(key, value, vector)
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size and whether semantic matching is enabled
+        """
+        with self._lock:
+            return {"size": len(self._entries), "semantic": self.embed is not None}
@@ -0,0 +1,99 @@
+"""
+Query Cache
+
+This module provides a small thread-safe LRU cache with per-entry expiry,
+used to avoid repeating identical knowledge base lookups.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class QueryCache:
+    """Thread-safe LRU cache with a time-to-live for each entry."""
+
+    def __init__(self, max_size: int = 2000, ttl_seconds: float = 600, enabled: bool = True):
+        """
+        Initialize the query cache.
+
+        Args:
+            max_size: Maximum number of entries kept before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            enabled: Whether caching is active (a disabled cache never stores anything)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, hits, misses and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
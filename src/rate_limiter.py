@@ -0,0 +1,129 @@
+"""
+Rate Limiter
+
+This module provides a client-side token bucket that keeps API calls under a
+provider's published rate limits, so bursts wait locally instead of being
+rejected by the server.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Mapping, Optional
+
+DAY_SECONDS = 86400
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to wait longer than the caller allows."""
+
+    def __init__(self, retry_after: float):
+        """
+        Initialize the exception.
+
+        Args:
+            retry_after: Seconds until a call would be allowed
+        """
+        super().__init__(f"Rate limit reached; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an optional rolling daily cap."""
+
+    def __init__(self, rate: float, burst: int, daily_cap: Optional[int] = None):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum tokens held (calls allowed back to back)
+            daily_cap: Maximum calls in any rolling 24 hours (unlimited if None)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.daily_cap = daily_cap
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._daily_calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self.daily_cap is not None:
+                while self._daily_calls and now - self._daily_calls[0] >= DAY_SECONDS:
+                    self._daily_calls.popleft()
+                if len(self._daily_calls) >= self.daily_cap:
+                    return self._daily_calls[0] + DAY_SECONDS - now
+
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+
+            self._tokens -= 1
+            if self.daily_cap is not None:
+                self._daily_calls.append(now)
+            return 0.0
+
+    def acquire(self, max_wait: Optional[float] = None):
+        """
+        Block until a call is allowed.
+
+        Args:
+            max_wait: Longest single wait accepted (unbounded if None)
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitExceeded(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait: Optional[float] = None):
+        """
+        Wait without blocking the event loop until a call is allowed.
+
+        Args:
+            max_wait: Longest single wait accepted (unbounded if None)
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitExceeded(wait)
+            await asyncio.sleep(wait)
+
+    def observe(self, headers: Mapping[str, str], prefix: str = "X-RateLimit"):
+        """
+        Align the bucket with the server's view of the short-term window.
+
+        Args:
+            headers: Response headers with comma-separated ``<prefix>-Limit`` and
+                ``<prefix>-Usage`` values, short window first (e.g. "100,1000" and "42,310")
+            prefix: Header name prefix
+        """
+        limit_header = headers.get(f"{prefix}-Limit")
+        usage_header = headers.get(f"{prefix}-Usage")
+        if not limit_header or not usage_header:
+            return
+        try:
+            short_limit = int(limit_header.split(",")[0])
+            short_usage = int(usage_header.split(",")[0])
+        except ValueError:
+            return
+
+        with self._lock:
+            self._tokens = min(self._tokens, max(short_limit - short_usage, 0))
@@ -0,0 +1,125 @@
+"""
+Session Store
+
+This module provides storage for authenticated user sessions. Sessions are kept
+in process memory by default, or in Redis when a Redis URL is configured so that
+every worker process sees the same logins and they survive restarts.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class InMemorySessionStore:
+    """Process-local session store (single worker only)."""
+
+    def __init__(self):
+        """Initialize an empty in-memory session store."""
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session data, or None if the session does not exist
+        """
+        return self._sessions.get(session_id)
+
+    async def set(self, session_id: str, data: Dict[str, Any], ttl_seconds: int):
+        """
+        Store a session.
+
+        Args:
+            session_id: Session identifier
+            data: Session data
+            ttl_seconds: Session lifetime (not enforced in memory)
+        """
+        self._sessions[session_id] = data
+
+    async def delete(self, session_id: str):
+        """
+        Remove a session.
+
+        Args:
+            session_id: Session identifier
+        """
+        self._sessions.pop(session_id, None)
+
+    async def close(self):
+        """Release resources held by the store."""
+
+class RedisSessionStore:
+    """Redis-backed session store shared by all worker processes."""
+
+    def __init__(self, redis_url: str, prefix: str = "sess:"):
+        """
+        Initialize the Redis session store.
+
+        Args:
+            redis_url: Redis connection URL (e.g. redis://localhost:6379/0)
+            prefix: Key prefix for session entries
+        """
+        import redis.asyncio as aioredis
+
+        self.prefix = prefix
+        self.redis = aioredis.from_url(redis_url, decode_responses=False)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session data, or None if the session does not exist or has expired
+        """
+        raw = await self.redis.get(f"{self.prefix}{session_id}")
+        return json.loads(raw) if raw else None
+
+    async def set(self, session_id: str, data: Dict[str, Any], ttl_seconds: int):
+        """
+        Store a session.
+
+        Args:
+            session_id: Session identifier
+            data: Session data
+            ttl_seconds: Seconds until Redis expires the session
+        """
+        await self.redis.set(f"{self.prefix}{session_id}", json.dumps(data), ex=ttl_seconds)
+
+    async def delete(self, session_id: str):
+        """
+        Remove a session.
+
+        Args:
+            session_id: Session identifier
+        """
+        await self.redis.delete(f"{self.prefix}{session_id}")
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self.redis.aclose()
+
+def create_session_store(redis_url: Optional[str] = None):
+    """
+    Create the session store for the given configuration.
+
+    Args:
+        redis_url: Redis connection URL; falls back to in-memory storage when not set
+
+    Returns:
+        A RedisSessionStore or InMemorySessionStore
+    """
+    if redis_url:
+        logger.info("Using Redis session store")
+        return RedisSessionStore(redis_url)
+
+    logger.info("Using in-memory session store (set REDIS_URL to share sessions across workers)")
+    return InMemorySessionStore()
@@ -6,26 +6,166 @@ to create intelligent, AI-generated activity descriptions and manage Strava acti
 """
 
 import os
+import asyncio
+import copy
+import json
 import logging
+import re
+import time
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+import httpx
 
 from .writer_client import WriterAPIClient
-from .strava_client import StravaAPIClient
-from .exercise_knowledge import ExerciseKnowledgeBase
+from .strava_client import StravaAPIClient, StravaAPIError
+from .exercise_knowledge import ExerciseKnowledgeBase, get_default_kb
+from .query_cache import QueryCache
+from .prompt_cache import SemanticPromptCache
+
+# Optional: faster JSON parsing (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Locally parsed prompts at or above this confidence skip the AI parser
+LOCAL_PARSE_MIN_CONFIDENCE = 0.7
+
+# Parses below this confidence are rejected instead of creating an activity
+MIN_CREATE_CONFIDENCE = 0.3
+
+# Skip the AI parser when less than this many seconds remain before the caller's deadline
+MIN_AI_PARSE_BUDGET_SECONDS = 0.5
+
+# Patterns and keyword sets used by the local prompt parser
+_DURATION_RE = re.compile(r'(?P<value>\d+)\s*(?P<unit>minute|min|hr|hour)')
+_DISTANCE_RE = re.compile(r'(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>km|k|mile)')
+_WORD_RE = re.compile(r'[a-z]+')
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+# Checked in order; the first sport whose words appear in the prompt wins
+_SPORT_KEYWORDS = (
+    ("Ride", frozenset({'bike', 'biked', 'biking', 'cycling', 'cycle', 'cycled', 'rode'})),
+    ("Swim", frozenset({'swim', 'swims', 'swam', 'swimming', 'pool'})),
+    ("Hike", frozenset({'hike', 'hikes', 'hiked', 'hiking', 'trail'})),
+    ("Walk", frozenset({'walk', 'walks', 'walked', 'walking'})),
+    ("Yoga", frozenset({'yoga', 'stretching'})),
+    ("WeightTraining", frozenset({'weight', 'weights', 'lifting', 'lifted', 'gym', 'strength'})),
+    ("Rowing", frozenset({'rowing', 'row', 'rowed'})),
+    ("CrossCountrySkiing", frozenset({'ski', 'skis', 'skied', 'skiing'})),
+    ("Elliptical", frozenset({'elliptical'})),
+    ("Run", frozenset({'run', 'runs', 'running', 'jog', 'jogged', 'jogging'})),
+)
+
+# Word -> (precedence, sport type), so one pass over the prompt's words finds the winning sport
+_SPORT_BY_WORD = {
+    word: (rank, sport)
+    for rank, (sport, sport_words) in enumerate(_SPORT_KEYWORDS)
+    for word in sport_words
+}
+
+def _keyword_sport(prompt: str) -> Optional[str]:
+    """The sport type the prompt's words name outright, if any (prompt must be lowercase)."""
+    match = min((_SPORT_BY_WORD[word] for word in _WORD_RE.findall(prompt) if word in _SPORT_BY_WORD), default=None)
+    return match[1] if match else None
+
+_MORNING_WORDS = frozenset({'morning', 'am'})
+_EVENING_WORDS = frozenset({'evening', 'night', 'pm'})
+_AFTERNOON_WORDS = frozenset({'afternoon'})
+_OUTDOOR_WORDS = frozenset({'park', 'outdoor', 'outside'})
+_GYM_WORDS = frozenset({'gym', 'indoor'})
+_GREAT_WORDS = frozenset({'amazing', 'awesome', 'fantastic'})
+_CHALLENGING_WORDS = frozenset({'tough', 'hard', 'difficult', 'challenging'})
+
+# (context field, value, words) in precedence order; earlier entries win within a field
+_CONTEXT_KEYWORDS = (
+    ('time_of_day', 'morning', _MORNING_WORDS),
+    ('time_of_day', 'evening', _EVENING_WORDS),
+    ('time_of_day', 'afternoon', _AFTERNOON_WORDS),
+    ('location', 'outdoor', _OUTDOOR_WORDS),
+    ('location', 'gym', _GYM_WORDS),
+    ('feeling', 'great', _GREAT_WORDS),
+    ('feeling', 'challenging', _CHALLENGING_WORDS),
+)
+
+# Word -> (precedence, field, value), so one pass over the prompt's words fills every context field
+_CONTEXT_BY_WORD = {
+    word: (rank, field, value)
+    for rank, (field, value, field_words) in enumerate(_CONTEXT_KEYWORDS)
+    for word in field_words
+}
+
+# Invariant instructions, schema and examples; sent first so providers can reuse the cached prefix
+_PARSE_SYSTEM_PROMPT = """You are an expert fitness activity parser enhanced with exercise knowledge. Parse the user's natural language description and extract structured activity data with rich context.
+
+CRITICAL: You MUST return ONLY a valid JSON object. Do not include any explanatory text, markdown formatting, or code blocks. Just pure JSON.
+
+Return this exact JSON structure:
+{
+    "sport_type": "one of: Run, Ride, Swim, Hike, Walk, WeightTraining, Yoga, CrossCountrySkiing, Rowing, Elliptical",
+    "duration_minutes": number (required),
+    "distance_km": number or null (optional),
+    "name": null,
+    "description_style": "one of: motivational, casual, technical, humorous",
+    "confidence": number between 0-1,
+    "context": {
+        "location": "string or null",
+        "time_of_day": "string or null",
+        "weather": "string or null",
+        "feeling": "string or null",
+        "companions": "string or null",
+        "intensity": "string or null",
+        "equipment": "string or null",
+        "goals": "string or null",
+        "achievements": "string or null",
+        "challenges": "string or null",
+        "route": "string or null",
+        "music": "string or null",
+        "nutrition": "string or null",
+        "recovery": "string or null",
+        "highlights": "string or null"
+    }
+}
+
+Examples:
+"I went for a 30 minute run this morning in the park, felt great!" 
+{"sport_type": "Run", "duration_minutes": 30, "distance_km": null, "name": null, "description_style": "casual", "confidence": 0.9, "context": {"location": "park", "time_of_day": "morning", "feeling": "felt great", "route": "park", "companions": "alone"}}
+
+"Did a tough 5k bike ride for 25 minutes, windy but pushed through!" 
+{"sport_type": "Ride", "duration_minutes": 25, "distance_km": 5, "name": null, "description_style": "motivational", "confidence": 0.95, "context": {"intensity": "tough", "weather": "windy", "challenges": "windy conditions", "achievements": "pushed through despite wind"}}
+
+Return ONLY the JSON object for this prompt:"""
+
+_PARSE_SYSTEM_MESSAGE = {"role": "system", "content": _PARSE_SYSTEM_PROMPT}
+
+def _now_iso(start_time: Optional[datetime] = None) -> str:
+    """Local start time (now if not given) as a timezone-aware ISO 8601 string, to the second."""
+    return (start_time or datetime.now()).astimezone().isoformat(timespec='seconds')
+
 class StravaActivityAgent:
     """
     Main agent that combines Writer AI and Strava API functionality
     to create and manage Strava activities with AI-generated content.
     """
     
+    __slots__ = (
+        'writer_api_key', 'writer_client',
+        'strava_client_id', 'strava_client_secret', 'strava_redirect_uri', 'strava_client',
+        'exercise_kb',
+        '_athlete_cache', '_activities_cache', '_activity_cache', '_prompt_cache'
+    )
+    
+    # Whether the Writer model accepts response_format={"type": "json_object"} for prompt parsing
+    supports_json_mode: bool = False
+    
     def __init__(
         self,
         writer_api_key: Optional[str] = None,
@@ -53,18 +193,19 @@ class StravaActivityAgent:
         if not self.writer_api_key:
             raise ValueError("Writer API key is required. Set WRITER_API_KEY environment variable or pass it explicitly.")
         
-        self.writer_client = WriterAPIClient(
-            api_key=self.writer_api_key,
-            model=writer_model or os.getenv('WRITER_MODEL', 'palmyra-x5')
-        )
-        
         # Initialize Strava client
-        self.strava_client_id = strava_client_id or os.getenv('STRAVA_CLIENT_ID')
-        self.strava_client_secret = strava_client_secret or os.getenv('STRAVA_CLIENT_SECRET')
-        self.strava_redirect_uri = strava_redirect_uri or os.getenv('STRAVA_REDIRECT_URI')
+        strava_credentials = {
+            'STRAVA_CLIENT_ID': strava_client_id or os.getenv('STRAVA_CLIENT_ID'),
+            'STRAVA_CLIENT_SECRET': strava_client_secret or os.getenv('STRAVA_CLIENT_SECRET'),
+            'STRAVA_REDIRECT_URI': strava_redirect_uri or os.getenv('STRAVA_REDIRECT_URI')
+        }
+        missing = [env_var for env_var, value in strava_credentials.items() if not value]
+        if missing:
+            raise ValueError(f"Missing Strava credentials: {', '.join(missing)}. Set these environment variables or pass them explicitly.")
         
-        if not all([self.strava_client_id, self.strava_client_secret, self.strava_redirect_uri]):
-            raise ValueError("Strava credentials are required. Set STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, and STRAVA_REDIRECT_URI environment variables.")
+        self.strava_client_id = strava_credentials['STRAVA_CLIENT_ID']
+        self.strava_client_secret = strava_credentials['STRAVA_CLIENT_SECRET']
+        self.strava_redirect_uri = strava_credentials['STRAVA_REDIRECT_URI']
         
         self.strava_client = StravaAPIClient(
             client_id=self.strava_client_id,
@@ -72,10 +213,31 @@ class StravaActivityAgent:
             redirect_uri=self.strava_redirect_uri
         )
         
-        # Initialize Exercise Knowledge Base
-        self.exercise_kb = ExerciseKnowledgeBase(
-            weaviate_url=weaviate_url,
-            api_key=weaviate_api_key
+        # Initialize Exercise Knowledge Base (shared unless a specific instance is requested)
+        if weaviate_url or weaviate_api_key:
+            self.exercise_kb = ExerciseKnowledgeBase(
+                weaviate_url=weaviate_url,
+                api_key=weaviate_api_key
+            )
+        else:
+            self.exercise_kb = get_default_kb()
+        
+        # Short-lived caches for Strava reads, keyed by access token so athletes never share entries
+        self._athlete_cache = QueryCache(max_size=1024, ttl_seconds=300)
+        self._activities_cache = QueryCache(max_size=1024, ttl_seconds=30)
+        self._activity_cache = QueryCache(max_size=64, ttl_seconds=10)
+        
+        # Successful AI prompt parses, so repeated or near-identical prompts skip the Writer round trip
+        embed = self.exercise_kb.embed_many if self.exercise_kb.embedder else None
+        # "30 min run" and "30 min ride" can embed almost identically, so the named sport must match too
+        self._prompt_cache = SemanticPromptCache(embed=embed, match_key=_keyword_sport)
+        
+        # Shared per key, model and embedder so every agent reuses the same warm connection pool;
+        # the embedder lets generated descriptions be reused for near-identical activity context
+        self.writer_client = WriterAPIClient.shared(
+            api_key=self.writer_api_key,
+            model=writer_model or os.getenv('WRITER_MODEL', 'palmyra-x5'),
+            embed=embed
         )
         
         logger.info("Strava Activity Agent initialized successfully with exercise knowledge base")
@@ -125,7 +287,7 @@ class StravaActivityAgent:
         """
         return self.strava_client.get_authorization_url(scopes)
     
-    def authenticate_strava(self, authorization_code: str) -> Dict[str, Any]:
+    async def authenticate_strava(self, authorization_code: str) -> Dict[str, Any]:
         """
         Complete Strava OAuth authentication.
         
@@ -135,7 +297,29 @@ class StravaActivityAgent:
         Returns:
             Token response from Strava
         """
-        return self.strava_client.exchange_token(authorization_code)
+        # Exchange on a token-less copy so the code never lands on a client other requests are using
+        client = self.strava_client.with_tokens(None, None, None)
+        return await client.exchange_token_async(authorization_code)
+    
+    def for_session(self, access_token: str, refresh_token: str, expires_at: int) -> "StravaActivityAgent":
+        """
+        Get an agent bound to one user's Strava tokens.
+        
+        The returned agent shares this agent's Writer client, knowledge base and caches, and its
+        Strava client shares the pooled connections, but the tokens are its own, so concurrent
+        requests for different athletes never act with each other's credentials.
+        
+        Args:
+            access_token: The access token
+            refresh_token: The refresh token
+            expires_at: Token expiration timestamp
+            
+        Returns:
+            Agent whose Strava calls use the given tokens
+        """
+        session_agent = copy.copy(self)
+        session_agent.strava_client = self.strava_client.with_tokens(access_token, refresh_token, expires_at)
+        return session_agent
     
     def set_strava_tokens(self, access_token: str, refresh_token: str, expires_at: int):
         """
@@ -167,30 +351,37 @@ class StravaActivityAgent:
         Returns:
             Created activity data from Strava
         """
-        # Make a copy to avoid modifying the original
-        enhanced_activity = activity_data.copy()
-        
-        # Generate AI name if requested
-        if generate_name:
-            try:
-                ai_name = self.writer_client.generate_activity_name(activity_data)
-                enhanced_activity['name'] = ai_name
-                logger.info(f"Generated AI name: {ai_name}")
-            except Exception as e:
-                logger.warning(f"Failed to generate AI name, using provided/default: {e}")
+        # Write generated fields to an overlay so the caller's (possibly large) dict is never copied
+        overrides: Dict[str, Any] = {}
+        enhanced_activity = ChainMap(overrides, activity_data)
         
-        # Generate AI description if requested
-        if generate_description:
-            try:
-                ai_description = self.writer_client.generate_activity_description(
-                    activity_data, 
-                    style=description_style
-                )
-                enhanced_activity['description'] = ai_description
-                logger.info(f"Generated AI description: {ai_description}")
-            except Exception as e:
-                logger.warning(f"Failed to generate AI description: {e}")
-                enhanced_activity['description'] = "Great workout! 💪"
+        # Request the AI name and description concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            name_future = pool.submit(self.writer_client.generate_activity_name, activity_data) if generate_name else None
+            description_future = pool.submit(
+                self.writer_client.generate_activity_description,
+                activity_data,
+                style=description_style
+            ) if generate_description else None
+            
+            # Generate AI name if requested
+            if name_future:
+                try:
+                    ai_name = name_future.result()
+                    enhanced_activity['name'] = ai_name
+                    logger.info(f"Generated AI name: {ai_name}")
+                except Exception as e:
+                    logger.warning(f"Failed to generate AI name, using provided/default: {e}")
+            
+            # Generate AI description if requested
+            if description_future:
+                try:
+                    ai_description = description_future.result()
+                    enhanced_activity['description'] = ai_description
+                    logger.info(f"Generated AI description: {ai_description}")
+                except Exception as e:
+                    logger.warning(f"Failed to generate AI description: {e}")
+                    enhanced_activity['description'] = "Great workout! 💪"
         
         # Ensure required fields are present
         if 'name' not in enhanced_activity:
@@ -198,11 +389,12 @@ class StravaActivityAgent:
         
         # Set default start time if not provided
         if 'start_date_local' not in enhanced_activity:
-            enhanced_activity['start_date_local'] = datetime.now().isoformat()
+            enhanced_activity['start_date_local'] = _now_iso()
         
         # Create the activity on Strava
         try:
             created_activity = self.strava_client.create_activity(enhanced_activity)
+            self._invalidate_activity_caches()
             logger.info(f"Successfully created activity with ID: {created_activity.get('id')}")
             return created_activity
         except Exception as e:
@@ -236,7 +428,7 @@ class StravaActivityAgent:
         # Get existing activity data for AI generation
         if regenerate_description or regenerate_name:
             try:
-                existing_activity = self.strava_client.get_activity(activity_id)
+                existing_activity = self._get_activity_cached(activity_id)
                 
                 # Generate new name if requested
                 if regenerate_name:
@@ -263,6 +455,7 @@ class StravaActivityAgent:
         # Update the activity on Strava
         try:
             updated_activity = self.strava_client.update_activity(activity_id, updates)
+            self._invalidate_activity_caches()
             logger.info(f"Successfully updated activity {activity_id}")
             return updated_activity
         except Exception as e:
@@ -275,7 +468,8 @@ class StravaActivityAgent:
         duration_minutes: int,
         distance_km: Optional[float] = None,
         name: Optional[str] = None,
-        description_style: str = "motivational"
+        description_style: str = "motivational",
+        start_time: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Create a quick activity with minimal input.
@@ -286,6 +480,7 @@ class StravaActivityAgent:
             distance_km: Distance in kilometers (optional)
             name: Activity name (will generate if not provided)
             description_style: Style for AI description
+            start_time: Activity start time (defaults to now); pass one value to give a batch a shared start
             
         Returns:
             Created activity data
@@ -293,7 +488,7 @@ class StravaActivityAgent:
         activity_data = {
             'sport_type': sport_type,
             'elapsed_time': duration_minutes * 60,  # Convert to seconds
-            'start_date_local': datetime.now().isoformat()
+            'start_date_local': _now_iso(start_time)
         }
         
         if distance_km:
@@ -316,7 +511,12 @@ class StravaActivityAgent:
         Returns:
             Athlete profile data
         """
-        return self.strava_client.get_athlete()
+        cache_key = self.strava_client.access_token
+        athlete = self._athlete_cache.get(cache_key)
+        if athlete is None:
+            athlete = self.strava_client.get_athlete()
+            self._athlete_cache.put(cache_key, athlete)
+        return athlete
     
     def get_recent_activities(self, count: int = 10) -> List[Dict[str, Any]]:
         """
@@ -328,7 +528,34 @@ class StravaActivityAgent:
         Returns:
             List of recent activities
         """
-        return self.strava_client.get_activities(per_page=count)
+        cache_key = (self.strava_client.access_token, count)
+        activities = self._activities_cache.get(cache_key)
+        if activities is None:
+            activities = self.strava_client.get_activities(per_page=count)
+            self._activities_cache.put(cache_key, activities)
+        return activities
+    
+    def _get_activity_cached(self, activity_id: int) -> Dict[str, Any]:
+        """
+        Get a single activity, reusing a fetch from the last few seconds.
+        
+        Args:
+            activity_id: ID of the activity
+            
+        Returns:
+            Activity data
+        """
+        cache_key = (self.strava_client.access_token, activity_id)
+        activity = self._activity_cache.get(cache_key)
+        if activity is None:
+            activity = self.strava_client.get_activity(activity_id)
+            self._activity_cache.put(cache_key, activity)
+        return activity
+    
+    def _invalidate_activity_caches(self):
+        """Drop cached activity reads after an activity is created or updated."""
+        self._activities_cache.clear()
+        self._activity_cache.clear()
     
     def enhance_activity_description(
         self,
@@ -347,7 +574,7 @@ class StravaActivityAgent:
         """
         try:
             # Get the activity data
-            activity = self.strava_client.get_activity(activity_id)
+            activity = self._get_activity_cached(activity_id)
             
             # Generate new description
             new_description = self.writer_client.generate_activity_description(
@@ -360,6 +587,7 @@ class StravaActivityAgent:
                 activity_id,
                 {'description': new_description}
             )
+            self._invalidate_activity_caches()
             
             logger.info(f"Enhanced description for activity {activity_id}")
             return new_description
@@ -368,11 +596,52 @@ class StravaActivityAgent:
             logger.error(f"Failed to enhance activity description: {e}")
             raise
 
-    async def parse_activity_prompt(self, prompt: str) -> Dict[str, Any]:
-        """Parse a natural language prompt to extract activity details using AI with exercise knowledge enhancement."""
+    async def parse_activity_prompt(self, prompt: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Parse a natural language prompt to extract activity details using AI with exercise knowledge enhancement.
+        
+        Args:
+            prompt: Natural language activity description
+            deadline: time.monotonic() value by which parsing must finish; the AI call is
+                skipped or cut short so the local parser can answer in time
+        """
+        if deadline is None:
+            return await self._parse_activity_prompt(prompt)
+        
+        # The knowledge base lookup can itself be a Weaviate round trip, so check the budget first
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_AI_PARSE_BUDGET_SECONDS:
+            logger.warning("Skipping AI prompt parsing: deadline too close")
+            return await self._fallback_parse_prompt(prompt, exercise_matches=[])
+        
+        try:
+            return await asyncio.wait_for(self._parse_activity_prompt(prompt, deadline), remaining)
+        except asyncio.TimeoutError:
+            # Out of time: parse locally without any further knowledge base calls
+            logger.warning("Prompt parsing hit the deadline, using local parser")
+            return await self._fallback_parse_prompt(prompt, exercise_matches=[])
+    
+    async def _parse_activity_prompt(self, prompt: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Parse a prompt with exercise knowledge and the AI (see parse_activity_prompt)."""
+        cached = await self._prompt_cache.lookup_async(prompt)
+        if cached is not None:
+            return {**copy.deepcopy(cached), "original_prompt": prompt}
+        
+        exercise_matches = None
         try:
             # First, use exercise knowledge base to enhance understanding
-            exercise_matches = self.exercise_kb.search_exercises(prompt)
+            exercise_matches = await self.exercise_kb.search_exercises_async(prompt)
+            
+            # Prompts that name the sport and duration plainly are parsed locally without calling the AI
+            local_result = await self._fallback_parse_prompt(
+                prompt, exercise_matches, min_confidence=LOCAL_PARSE_MIN_CONFIDENCE
+            )
+            if (
+                local_result["status"] == "success"
+                and local_result["parsed_data"]["confidence"] >= LOCAL_PARSE_MIN_CONFIDENCE
+            ):
+                local_result["method"] = "local"
+                return local_result
             
             # Build enhanced context for AI prompt
             enhanced_context = ""
@@ -386,208 +655,168 @@ Based on exercise knowledge, this appears to be related to:
 - Typical locations: {', '.join(top_exercise.get('location_types', []))}
 """
 
-            system_prompt = f"""You are an expert fitness activity parser enhanced with exercise knowledge. Parse the user's natural language description and extract structured activity data with rich context.
-
-{enhanced_context}
-
-CRITICAL: You MUST return ONLY a valid JSON object. Do not include any explanatory text, markdown formatting, or code blocks. Just pure JSON.
 
-Return this exact JSON structure:
-{{
-    "sport_type": "one of: Run, Ride, Swim, Hike, Walk, WeightTraining, Yoga, CrossCountrySkiing, Rowing, Elliptical",
-    "duration_minutes": number (required),
-    "distance_km": number or null (optional),
-    "name": null,
-    "description_style": "one of: motivational, casual, technical, humorous",
-    "confidence": number between 0-1,
-    "context": {{
-        "location": "string or null",
-        "time_of_day": "string or null",
-        "weather": "string or null",
-        "feeling": "string or null",
-        "companions": "string or null",
-        "intensity": "string or null",
-        "equipment": "string or null",
-        "goals": "string or null",
-        "achievements": "string or null",
-        "challenges": "string or null",
-        "route": "string or null",
-        "music": "string or null",
-        "nutrition": "string or null",
-        "recovery": "string or null",
-        "highlights": "string or null"
-    }}
-}}
-
-Examples:
-"I went for a 30 minute run this morning in the park, felt great!" 
-{{"sport_type": "Run", "duration_minutes": 30, "distance_km": null, "name": null, "description_style": "casual", "confidence": 0.9, "context": {{"location": "park", "time_of_day": "morning", "feeling": "felt great", "route": "park", "companions": "alone"}}}}
-
-"Did a tough 5k bike ride for 25 minutes, windy but pushed through!" 
-{{"sport_type": "Ride", "duration_minutes": 25, "distance_km": 5, "name": null, "description_style": "motivational", "confidence": 0.95, "context": {{"intensity": "tough", "weather": "windy", "challenges": "windy conditions", "achievements": "pushed through despite wind"}}}}
-
-Return ONLY the JSON object for this prompt:"""
-
-            response = await self.writer_client.client.post(
-                "/v1/chat/completions",
-                json={
-                    "model": "palmyra-x5",
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 800,
-                    "temperature": 0.1,
-                    "response_format": {"type": "json_object"} if hasattr(self, 'supports_json_mode') else None
-                },
-                timeout=30.0
-            )
+            # Per-prompt knowledge goes in its own message after the static prefix
+            messages = [_PARSE_SYSTEM_MESSAGE]
+            if enhanced_context:
+                messages.append({"role": "system", "content": enhanced_context.strip()})
+            messages.append({"role": "user", "content": prompt})
+            
+            timeout = 30.0
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining < MIN_AI_PARSE_BUDGET_SECONDS:
+                    logger.warning("Skipping AI prompt parsing: deadline too close")
+                    return await self._fallback_parse_prompt(prompt, exercise_matches)
+                timeout = min(remaining, timeout)
+            
+            request = {
+                "model": self.writer_client.model,
+                "messages": messages,
+                "max_tokens": 800,
+                "temperature": 0.1
+            }
+            if self.supports_json_mode:
+                request["response_format"] = {"type": "json_object"}
             
-            if response.status_code == 200:
+            # Stream the reply and stop reading once the JSON object closes; the httpx timeout only
+            # bounds each read, so wait_for keeps a steadily streaming reply within the deadline
+            try:
+                content = await asyncio.wait_for(
+                    self.writer_client.stream_json_completion(request, timeout=timeout), remaining
+                )
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Writer API error: {e.response.status_code}")
+                return await self._fallback_parse_prompt(prompt, exercise_matches)
+            
+            try:
+                content = content.strip()
+                logger.info(f"AI response content: {content}")
+                
+                if not content:
+                    logger.error("AI returned empty content")
+                    return {"status": "error", "message": "AI returned empty response"}
+                
+                # Try to parse the JSON response
                 try:
-                    ai_response = response.json()
-                    if "choices" not in ai_response or len(ai_response["choices"]) == 0:
-                        logger.error(f"Invalid AI response structure: {ai_response}")
-                        return {"status": "error", "message": "AI returned invalid response structure"}
+                    # Clean up common JSON formatting issues
+                    if '```' in content:
+                        content_cleaned = _FENCE_RE.sub('', content)
+                    else:
+                        content_cleaned = content
                     
-                    content = ai_response["choices"][0]["message"]["content"].strip()
-                    logger.info(f"AI response content: {content}")
+                    parsed_data = _json_loads(content_cleaned)
                     
-                    if not content:
-                        logger.error("AI returned empty content")
-                        return {"status": "error", "message": "AI returned empty response"}
+                    # Validate required fields
+                    if not isinstance(parsed_data.get("duration_minutes"), (int, float)) or parsed_data["duration_minutes"] <= 0:
+                        raise ValueError("Invalid duration_minutes")
                     
-                    # Try to parse the JSON response
-                    try:
-                        import json
-                        # Clean up common JSON formatting issues
-                        content_cleaned = content.strip()
-                        if content_cleaned.startswith('```json'):
-                            content_cleaned = content_cleaned.replace('```json', '').replace('```', '').strip()
-                        
-                        parsed_data = json.loads(content_cleaned)
-                        
-                        # Validate required fields
-                        if not isinstance(parsed_data.get("duration_minutes"), (int, float)) or parsed_data["duration_minutes"] <= 0:
-                            raise ValueError("Invalid duration_minutes")
-                        
-                        # Set defaults for missing fields
-                        parsed_data.setdefault("description_style", "casual")
-                        parsed_data.setdefault("confidence", 0.5)
-                        parsed_data.setdefault("context", {})
-                        
-                        # Enhance with exercise knowledge
-                        if exercise_matches:
-                            sport_type = parsed_data.get("sport_type")
-                            enhanced_context = self.exercise_kb.enhance_activity_context(sport_type, parsed_data["context"])
-                            parsed_data["context"] = enhanced_context
-                            
-                            # Add exercise knowledge metadata
-                            parsed_data["exercise_knowledge"] = {
-                                "matched_exercise": exercise_matches[0]["name"],
-                                "confidence_score": exercise_matches[0]["score"],
-                                "suggested_keywords": exercise_matches[0].get("keywords", [])
-                            }
+                    # Set defaults for missing fields
+                    parsed_data.setdefault("description_style", "casual")
+                    parsed_data.setdefault("confidence", 0.5)
+                    parsed_data.setdefault("context", {})
+                    
+                    # Enhance with exercise knowledge (pointless for parses too vague to create an activity from)
+                    if exercise_matches and parsed_data["confidence"] >= MIN_CREATE_CONFIDENCE:
+                        sport_type = parsed_data.get("sport_type")
+                        enhanced_context = await self.exercise_kb.enhance_activity_context_async(sport_type, parsed_data["context"])
+                        parsed_data["context"] = enhanced_context
                         
-                        return {
-                            "status": "success",
-                            "parsed_data": parsed_data,
-                            "original_prompt": prompt
+                        # Add exercise knowledge metadata
+                        parsed_data["exercise_knowledge"] = {
+                            "matched_exercise": exercise_matches[0]["name"],
+                            "confidence_score": exercise_matches[0]["score"],
+                            "suggested_keywords": exercise_matches[0].get("keywords", [])
                         }
-                        
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse AI response as JSON: {content}")
-                        # Try to extract basic info with regex as fallback
-                        return await self._fallback_parse_prompt(prompt)
-                        
-                except Exception as e:
-                    logger.error(f"Error processing AI response: {str(e)}")
-                    return await self._fallback_parse_prompt(prompt)
                     
-            else:
-                logger.error(f"Writer API error: {response.status_code} - {await response.atext()}")
-                return await self._fallback_parse_prompt(prompt)
+                    result = {
+                        "status": "success",
+                        "parsed_data": parsed_data,
+                        "original_prompt": prompt
+                    }
+                    # Only AI successes are cached; fallbacks after a Writer error are retried next time
+                    await self._prompt_cache.insert_async(prompt, copy.deepcopy(result))
+                    return result
+                    
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse AI response as JSON: {content}")
+                    # Try to extract basic info with regex as fallback
+                    return await self._fallback_parse_prompt(prompt, exercise_matches)
+                    
+            except Exception as e:
+                logger.error(f"Error processing AI response: {str(e)}")
+                return await self._fallback_parse_prompt(prompt, exercise_matches)
                 
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            logger.warning("AI prompt parsing timed out, using local parser")
+            return await self._fallback_parse_prompt(prompt, exercise_matches)
         except Exception as e:
             logger.error(f"Error parsing activity prompt: {str(e)}")
-            return await self._fallback_parse_prompt(prompt)
+            return await self._fallback_parse_prompt(prompt, exercise_matches)
 
-    async def _fallback_parse_prompt(self, prompt: str) -> Dict[str, Any]:
-        """Fallback method to parse prompts when AI fails, enhanced with exercise knowledge."""
-        import re
+    async def _fallback_parse_prompt(
+        self,
+        prompt: str,
+        exercise_matches: Optional[List[Dict[str, Any]]] = None,
+        min_confidence: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Fallback method to parse prompts when AI fails, enhanced with exercise knowledge.
         
+        Parses below min_confidence are returned without the knowledge enhancement, since
+        the caller is going to discard them.
+        """
         try:
             prompt_lower = prompt.lower()
+            words = set(_WORD_RE.findall(prompt_lower))
             
             # Extract duration with regex
-            duration_match = re.search(r'(\d+)\s*(?:minute|min|hr|hour)', prompt_lower)
+            duration_match = _DURATION_RE.search(prompt_lower)
             if not duration_match:
                 return {"status": "error", "message": "Could not find duration in your description. Please include how long you exercised (e.g., '30 minutes')."}
             
-            duration = int(duration_match.group(1))
-            if 'hour' in duration_match.group(0) or 'hr' in duration_match.group(0):
+            duration = int(duration_match.group('value'))
+            if duration_match.group('unit') in ('hr', 'hour'):
                 duration *= 60  # Convert hours to minutes
             
             # Extract distance if present
             distance = None
-            distance_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:km|k|mile)', prompt_lower)
+            distance_match = _DISTANCE_RE.search(prompt_lower)
             if distance_match:
-                distance = float(distance_match.group(1))
-                if 'mile' in distance_match.group(0):
+                distance = float(distance_match.group('value'))
+                if distance_match.group('unit') == 'mile':
                     distance *= 1.609  # Convert miles to km
             
-            # Use exercise knowledge base to determine sport type
-            exercise_matches = self.exercise_kb.search_exercises(prompt)
-            sport_type = "Run"  # Default
+            # Keyword matching for the sport type
+            keyword_sport_type = _keyword_sport(prompt_lower)
             
-            if exercise_matches:
-                # Use the best match from exercise knowledge
-                top_match = exercise_matches[0]
-                sport_type = top_match["sport_type"]
+            # Use exercise knowledge base to determine sport type
+            if exercise_matches is None:
+                exercise_matches = await self.exercise_kb.search_exercises_async(prompt)
+            sport_type = keyword_sport_type or "Run"  # Default
+            knowledge_sport_type = exercise_matches[0]["sport_type"] if exercise_matches else None
+            
+            if knowledge_sport_type and not keyword_sport_type:
+                # No sport named outright; use the best match from exercise knowledge
+                sport_type = knowledge_sport_type
                 logger.info(f"Exercise knowledge suggested sport type: {sport_type} for prompt: {prompt}")
-            else:
-                # Fallback to keyword matching
-                if any(word in prompt_lower for word in ['bike', 'cycling', 'cycle', 'rode']):
-                    sport_type = "Ride"
-                elif any(word in prompt_lower for word in ['swim', 'swimming', 'pool']):
-                    sport_type = "Swim"
-                elif any(word in prompt_lower for word in ['hike', 'hiking', 'trail']):
-                    sport_type = "Hike"
-                elif any(word in prompt_lower for word in ['walk', 'walking']):
-                    sport_type = "Walk"
-                elif any(word in prompt_lower for word in ['yoga', 'stretching']):
-                    sport_type = "Yoga"
-                elif any(word in prompt_lower for word in ['weight', 'lifting', 'gym', 'strength']):
-                    sport_type = "WeightTraining"
-                elif any(word in prompt_lower for word in ['rowing', 'row']):
-                    sport_type = "Rowing"
-                elif any(word in prompt_lower for word in ['ski', 'skiing']):
-                    sport_type = "CrossCountrySkiing"
-                elif any(word in prompt_lower for word in ['elliptical']):
-                    sport_type = "Elliptical"
+            
+            # Confident only when the keywords name a sport the knowledge base doesn't contradict
+            confidence = 0.3  # Lower confidence for fallback parsing
+            if keyword_sport_type and knowledge_sport_type in (None, keyword_sport_type):
+                confidence = 0.8
             
             # Extract basic context
             context = {}
-            if any(word in prompt_lower for word in ['morning', 'am']):
-                context['time_of_day'] = 'morning'
-            elif any(word in prompt_lower for word in ['evening', 'night', 'pm']):
-                context['time_of_day'] = 'evening'
-            elif any(word in prompt_lower for word in ['afternoon']):
-                context['time_of_day'] = 'afternoon'
-            
-            if any(word in prompt_lower for word in ['park', 'outdoor', 'outside']):
-                context['location'] = 'outdoor'
-            elif any(word in prompt_lower for word in ['gym', 'indoor']):
-                context['location'] = 'gym'
-            
-            if any(word in prompt_lower for word in ['felt great', 'amazing', 'awesome', 'fantastic']):
+            for _, field, value in sorted(_CONTEXT_BY_WORD[word] for word in words if word in _CONTEXT_BY_WORD):
+                context.setdefault(field, value)
+            if 'felt great' in prompt_lower:
                 context['feeling'] = 'great'
-            elif any(word in prompt_lower for word in ['tough', 'hard', 'difficult', 'challenging']):
-                context['feeling'] = 'challenging'
             
             # Enhance context with exercise knowledge if available
-            if exercise_matches:
-                enhanced_context = self.exercise_kb.enhance_activity_context(sport_type, context)
+            if exercise_matches and confidence >= min_confidence:
+                enhanced_context = await self.exercise_kb.enhance_activity_context_async(sport_type, context)
                 context = enhanced_context
             
             parsed_data = {
@@ -596,7 +825,7 @@ Return ONLY the JSON object for this prompt:"""
                 "distance_km": distance,
                 "name": None,
                 "description_style": "casual",
-                "confidence": 0.3,  # Lower confidence for fallback parsing
+                "confidence": confidence,
                 "context": context
             }
             
@@ -620,11 +849,37 @@ Return ONLY the JSON object for this prompt:"""
             logger.error(f"Error in fallback parsing: {str(e)}")
             return {"status": "error", "message": f"Failed to parse activity: {str(e)}"}
 
-    async def create_activity_from_prompt(self, prompt: str) -> Dict[str, Any]:
-        """Create a Strava activity from a natural language prompt."""
+    async def parse_activity_prompts_locally(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse many prompts without the AI, e.g. when importing a history of activity notes.
+
+        The exercise knowledge lookups for all prompts share one batched Weaviate request.
+
+        Args:
+            prompts: Natural language activity descriptions
+
+        Returns:
+            One parse result per prompt, in the same order as ``prompts``
+        """
+        all_matches = await self.exercise_kb.search_exercises_batch_async(prompts)
+        return [
+            await self._fallback_parse_prompt(prompt, exercise_matches)
+            for prompt, exercise_matches in zip(prompts, all_matches)
+        ]
+
+    async def create_activity_from_prompt(self, prompt: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Create a Strava activity from a natural language prompt.
+        
+        Args:
+            prompt: Natural language activity description
+            deadline: time.monotonic() value by which prompt parsing must finish
+        """
+        # Make sure the Strava token is fresh while the prompt is being parsed
+        token_refresh = asyncio.create_task(self._refresh_token_quietly())
         try:
             # First, parse the prompt to extract activity details
-            parse_result = await self.parse_activity_prompt(prompt)
+            parse_result = await self.parse_activity_prompt(prompt, deadline)
             
             if parse_result["status"] != "success":
                 return parse_result
@@ -632,13 +887,14 @@ Return ONLY the JSON object for this prompt:"""
             parsed_data = parse_result["parsed_data"]
             
             # Validate confidence level
-            if parsed_data.get("confidence", 0) < 0.3:
+            if parsed_data.get("confidence", 0) < MIN_CREATE_CONFIDENCE:
                 return {
                     "status": "error", 
                     "message": "Unable to understand the activity details from your prompt. Please be more specific about the activity type and duration."
                 }
             
             # Create activity using parsed data
+            await token_refresh
             result = await self.create_quick_activity_with_ai(
                 sport_type=parsed_data["sport_type"],
                 duration_minutes=int(parsed_data["duration_minutes"]),
@@ -661,33 +917,43 @@ Return ONLY the JSON object for this prompt:"""
         except Exception as e:
             logger.error(f"Error creating activity from prompt: {str(e)}")
             return {"status": "error", "message": str(e)}
+        finally:
+            # Let the refresh finish on every exit; cancelling it mid-flight could lose a rotated refresh token
+            await token_refresh
+
+    async def _refresh_token_quietly(self):
+        """Refresh the Strava token ahead of time; failures resurface when the activity is created."""
+        try:
+            await self.strava_client.ensure_valid_token_async()
+        except Exception as e:
+            logger.warning(f"Early Strava token refresh failed: {e}")
 
     async def create_quick_activity_with_ai(self, sport_type: str, duration_minutes: int, 
                                            distance_km: Optional[float] = None, 
                                            name: Optional[str] = None,
                                            description_style: str = "motivational",
-                                           context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                           context: Optional[Dict[str, Any]] = None,
+                                           start_time: Optional[datetime] = None) -> Dict[str, Any]:
         """Create a Strava activity with AI-generated content (async version)."""
         try:
             if context is None:
                 context = {}
                 
-            # Generate AI-powered name if not provided
-            if not name:
-                name = await self.writer_client.generate_activity_name_with_context(
-                    sport_type, duration_minutes, distance_km, context
+            # Generate the AI-powered description (and name if not provided, in the same call)
+            if name:
+                description = await self.writer_client.generate_activity_description_with_context(
+                    sport_type, duration_minutes, distance_km, description_style, context
+                )
+            else:
+                name, description = await self.writer_client.generate_name_and_description(
+                    sport_type, duration_minutes, distance_km, description_style, context
                 )
-            
-            # Generate AI-powered description
-            description = await self.writer_client.generate_activity_description_with_context(
-                sport_type, duration_minutes, distance_km, description_style, context
-            )
             
             # Create the activity on Strava
             activity_data = {
                 "name": name,
                 "sport_type": sport_type,
-                "start_date_local": datetime.now().isoformat(),
+                "start_date_local": _now_iso(start_time),
                 "elapsed_time": duration_minutes * 60,  # Convert to seconds
                 "description": description,
                 "trainer": False,
@@ -697,7 +963,8 @@ Return ONLY the JSON object for this prompt:"""
             if distance_km:
                 activity_data["distance"] = distance_km * 1000  # Convert to meters
             
-            activity = self.strava_client.create_activity(activity_data)
+            activity = await self.strava_client.create_activity_async(activity_data)
+            self._invalidate_activity_caches()
             
             return {
                 "status": "success",
@@ -708,6 +975,16 @@ Return ONLY the JSON object for this prompt:"""
                 }
             }
             
+        except StravaAPIError as e:
+            logger.error(f"Error creating activity with AI: {str(e)}")
+            if e.rate_limited:
+                return {"status": "rate_limited", "retry_after": e.retry_after, "message": str(e)}
+            return {"status": "error", "message": str(e)}
         except Exception as e:
             logger.error(f"Error creating activity with AI: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
+    
+    async def aclose(self):
+        """Close the HTTP clients held by the agent."""
+        await self.strava_client.aclose()
+        await self.writer_client.aclose()
\ No newline at end of file
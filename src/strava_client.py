@@ -5,19 +5,115 @@ This module provides a client for interacting with the Strava API, including
 OAuth authentication and activity management.
 """
 
-import requests
+import asyncio
+import copy
+import httpx
 import json
 import logging
+import random
+import threading
+import time
 import urllib.parse
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Mapping, Optional, Any
+
+# Optional: faster JSON encoding and decoding (orjson.JSONDecodeError subclasses ValueError)
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    _json_loads = json.loads
+
+# Optional: HTTP/2 multiplexing needs the h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+from .rate_limiter import RateLimitExceeded, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Tokens are refreshed this many seconds before they expire
+TOKEN_REFRESH_BUFFER_SECONDS = 60
+
+# Activity fields accepted by the create and update endpoints
+_CREATE_REQUIRED_FIELDS = ('name', 'sport_type', 'start_date_local', 'elapsed_time')
+_CREATE_OPTIONAL_FIELDS = ('type', 'description', 'distance', 'trainer', 'commute')
+_UPDATE_ALLOWED_FIELDS = frozenset({
+    'name', 'type', 'sport_type', 'description', 'trainer',
+    'commute', 'hide_from_home', 'gear_id'
+})
+
+# Strava's default application limits: 100 requests per 15 minutes, 1000 per day
+RATE_LIMIT_PER_15_MINUTES = 100
+RATE_LIMIT_PER_DAY = 1000
+
+# Server errors are only retried for methods that are safe to repeat (a retried POST could duplicate an activity)
+_IDEMPOTENT_METHODS = frozenset({'GET', 'PUT', 'DELETE'})
+
+class StravaAPIError(Exception):
+    """A failed Strava API request, with the rate-limit details callers need to back off."""
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Error message
+            status_code: HTTP status code (None if no response was received)
+            retry_after: Seconds to wait before retrying, if known
+            headers: Response headers
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.headers = headers if headers is not None else {}
+        # Comma-separated usage for the 15-minute and daily windows, e.g. "42,310"
+        self.rate_limit_usage = self.headers.get('X-RateLimit-Usage')
+    
+    @property
+    def rate_limited(self) -> bool:
+        """Whether the request was refused because of rate limiting."""
+        return self.status_code == 429 or (self.status_code is None and self.retry_after is not None)
+    
+    @classmethod
+    def from_exception(cls, e: Exception) -> "StravaAPIError":
+        """Build the error from an HTTP, decoding or local rate-limit failure."""
+        message = f"Strava API request failed: {e}"
+        if isinstance(e, RateLimitExceeded):
+            return cls(message, retry_after=e.retry_after)
+        response = e.response if isinstance(e, httpx.HTTPStatusError) else None
+        if response is None:
+            return cls(message)
+        
+        retry_after = None
+        if response.headers.get('Retry-After'):
+            try:
+                retry_after = float(response.headers['Retry-After'])
+            except ValueError:
+                pass
+        return cls(message, status_code=response.status_code, retry_after=retry_after, headers=response.headers)
+
 class StravaAPIClient:
     """Client for interacting with the Strava API."""
     
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str,
+        max_retries: int = 3,
+        backoff_cap: float = 60.0
+    ):
         """
         Initialize the Strava API client.
         
@@ -25,15 +121,54 @@ class StravaAPIClient:
             client_id: Your Strava application client ID
             client_secret: Your Strava application client secret
             redirect_uri: OAuth redirect URI
+            max_retries: Retries for rate-limited (429) and server error (5xx) responses
+            backoff_cap: Longest wait in seconds before a retry
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.base_url = "https://www.strava.com/api/v3"
         self.oauth_url = "https://www.strava.com/oauth"
+        self._athlete_url = f"{self.base_url}/athlete"
+        self._athlete_activities_url = f"{self.base_url}/athlete/activities"
+        self._activities_url = f"{self.base_url}/activities"
         self.access_token = None
         self.refresh_token = None
         self.token_expires_at = None
+        # Serialize refreshes so concurrent callers don't each spend an OAuth round trip
+        self._refresh_lock = threading.Lock()
+        # Created on first use so it binds to the running event loop, not the import-time one
+        self._async_refresh_lock: Optional[asyncio.Lock] = None
+        self.max_retries = max_retries
+        # Throttle locally so bursts wait here instead of being rejected with 429s
+        self._limiter = TokenBucket(
+            rate=RATE_LIMIT_PER_15_MINUTES / 900,
+            burst=RATE_LIMIT_PER_15_MINUTES,
+            daily_cap=RATE_LIMIT_PER_DAY
+        )
+        # Authorization URLs only depend on the scopes, so each distinct scope list is built once
+        self._auth_urls: Dict[tuple, str] = {}
+        self.backoff_cap = backoff_cap
+        # Pooled clients so repeat calls reuse the TLS connection to strava.com; with HTTP/2
+        # concurrent calls are multiplexed over that one connection
+        limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        self.session = httpx.Client(http2=_HTTP2_AVAILABLE, timeout=30.0, limits=limits)
+        # Async client for calls made from the web app's event loop
+        self.async_client = httpx.AsyncClient(http2=_HTTP2_AVAILABLE, timeout=30.0, limits=limits)
+    
+    @property
+    def access_token(self) -> Optional[str]:
+        """The current access token."""
+        return self._access_token
+    
+    @access_token.setter
+    def access_token(self, value: Optional[str]):
+        # Build the request headers once per token instead of once per request
+        self._access_token = value
+        self._auth_headers = {
+            'Authorization': f'Bearer {value}',
+            'Content-Type': 'application/json'
+        } if value else None
     
     def get_authorization_url(self, scopes: List[str] = None) -> str:
         """
@@ -48,6 +183,11 @@ class StravaAPIClient:
         if scopes is None:
             scopes = ['activity:write', 'activity:read_all', 'profile:read_all']
         
+        cache_key = tuple(scopes)
+        auth_url = self._auth_urls.get(cache_key)
+        if auth_url is not None:
+            return auth_url
+        
         params = {
             'client_id': self.client_id,
             'redirect_uri': self.redirect_uri,
@@ -58,6 +198,7 @@ class StravaAPIClient:
         
         query_string = urllib.parse.urlencode(params)
         auth_url = f"{self.oauth_url}/authorize?{query_string}"
+        self._auth_urls[cache_key] = auth_url
         
         logger.info(f"Generated authorization URL with scopes: {scopes}")
         return auth_url
@@ -84,14 +225,10 @@ class StravaAPIClient:
         
         try:
             logger.info("Exchanging authorization code for access token")
-            response = requests.post(
-                f"{self.oauth_url}/token",
-                data=payload,
-                timeout=30
-            )
+            response = self.session.post(f"{self.oauth_url}/token", data=payload)
             
             response.raise_for_status()
-            token_data = response.json()
+            token_data = _json_loads(response.content)
             
             # Store tokens
             self.access_token = token_data['access_token']
@@ -101,7 +238,46 @@ class StravaAPIClient:
             logger.info("Successfully obtained access token")
             return token_data
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Token exchange failed: {e}")
+            raise Exception(f"Failed to exchange authorization code: {e}")
+    
+    async def exchange_token_async(self, authorization_code: str) -> Dict[str, Any]:
+        """
+        Exchange authorization code for access and refresh tokens (async version).
+        
+        Args:
+            authorization_code: The authorization code from the OAuth callback
+            
+        Returns:
+            Token response from Strava
+            
+        Raises:
+            Exception: If token exchange fails
+        """
+        payload = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'code': authorization_code,
+            'grant_type': 'authorization_code'
+        }
+        
+        try:
+            logger.info("Exchanging authorization code for access token")
+            response = await self.async_client.post(f"{self.oauth_url}/token", data=payload)
+            
+            response.raise_for_status()
+            token_data = _json_loads(response.content)
+            
+            # Store tokens
+            self.access_token = token_data['access_token']
+            self.refresh_token = token_data['refresh_token']
+            self.token_expires_at = token_data['expires_at']
+            
+            logger.info("Successfully obtained access token")
+            return token_data
+            
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"Token exchange failed: {e}")
             raise Exception(f"Failed to exchange authorization code: {e}")
     
@@ -127,14 +303,49 @@ class StravaAPIClient:
         
         try:
             logger.info("Refreshing access token")
-            response = requests.post(
-                f"{self.oauth_url}/token",
-                data=payload,
-                timeout=30
-            )
+            response = self.session.post(f"{self.oauth_url}/token", data=payload)
+            
+            response.raise_for_status()
+            token_data = _json_loads(response.content)
+            
+            # Update tokens
+            self.access_token = token_data['access_token']
+            self.refresh_token = token_data['refresh_token']
+            self.token_expires_at = token_data['expires_at']
+            
+            logger.info("Successfully refreshed access token")
+            return token_data
+            
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Token refresh failed: {e}")
+            raise Exception(f"Failed to refresh access token: {e}")
+    
+    async def refresh_access_token_async(self) -> Dict[str, Any]:
+        """
+        Refresh the access token using the refresh token (async version).
+        
+        Returns:
+            New token response from Strava
+            
+        Raises:
+            Exception: If token refresh fails
+        """
+        if not self.refresh_token:
+            raise Exception("No refresh token available")
+        
+        payload = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'refresh_token': self.refresh_token,
+            'grant_type': 'refresh_token'
+        }
+        
+        try:
+            logger.info("Refreshing access token")
+            response = await self.async_client.post(f"{self.oauth_url}/token", data=payload)
             
             response.raise_for_status()
-            token_data = response.json()
+            token_data = _json_loads(response.content)
             
             # Update tokens
             self.access_token = token_data['access_token']
@@ -144,25 +355,44 @@ class StravaAPIClient:
             logger.info("Successfully refreshed access token")
             return token_data
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logger.error(f"Token refresh failed: {e}")
             raise Exception(f"Failed to refresh access token: {e}")
     
+    def _token_expiring(self) -> bool:
+        """Whether the access token expires within the refresh buffer."""
+        return bool(self.token_expires_at) and time.time() + TOKEN_REFRESH_BUFFER_SECONDS >= self.token_expires_at
+    
+    async def ensure_valid_token_async(self):
+        """Ensure we have a valid access token, refreshing it without blocking if necessary."""
+        if not self.access_token:
+            raise Exception("No access token available. Please authenticate first.")
+        
+        if self._token_expiring():
+            if self._async_refresh_lock is None:
+                self._async_refresh_lock = asyncio.Lock()
+            async with self._async_refresh_lock:
+                # Another caller may have refreshed while we waited
+                if self._token_expiring():
+                    logger.info("Access token is expired, refreshing...")
+                    await self.refresh_access_token_async()
+    
     def _ensure_valid_token(self):
         """Ensure we have a valid access token, refresh if necessary."""
         if not self.access_token:
             raise Exception("No access token available. Please authenticate first.")
         
-        # Check if token is expired (with 5 minute buffer)
-        current_time = datetime.now().timestamp()
-        if self.token_expires_at and (current_time + 300) >= self.token_expires_at:
-            logger.info("Access token is expired, refreshing...")
-            self.refresh_access_token()
+        if self._token_expiring():
+            with self._refresh_lock:
+                # Another caller may have refreshed while we waited
+                if self._token_expiring():
+                    logger.info("Access token is expired, refreshing...")
+                    self.refresh_access_token()
     
     def _make_authenticated_request(
         self,
         method: str,
-        endpoint: str,
+        url: str,
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -171,7 +401,7 @@ class StravaAPIClient:
         
         Args:
             method: HTTP method (GET, POST, PUT, etc.)
-            endpoint: API endpoint (without base URL)
+            url: Full API URL (see the *_url attributes set in __init__)
             data: Request body data
             params: Query parameters
             
@@ -179,33 +409,121 @@ class StravaAPIClient:
             API response
             
         Raises:
-            Exception: If the request fails
+            StravaAPIError: If the request fails
         """
         self._ensure_valid_token()
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+        headers = self._auth_headers
         
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._limiter.acquire(max_wait=self.backoff_cap)
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    content=_json_dumps(data) if data is not None else None,
+                    params=params
+                )
+                
+                self._limiter.observe(response.headers)
+                delay = self._retry_delay(method, response.status_code, response.headers, attempt)
+                if delay is None:
+                    break
+                time.sleep(delay)
+            
+            response.raise_for_status()
+            return _json_loads(response.content)
+            
+        except (httpx.HTTPError, ValueError, RateLimitExceeded) as e:
+            logger.error(f"Strava API request failed: {method} {url} - {e}")
+            raise StravaAPIError.from_exception(e) from e
+    
+    async def _make_authenticated_request_async(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Make an authenticated request to the Strava API (async version).
+        
+        Args:
+            method: HTTP method (GET, POST, PUT, etc.)
+            url: Full API URL (see the *_url attributes set in __init__)
+            data: Request body data
+            params: Query parameters
+            
+        Returns:
+            API response
+            
+        Raises:
+            StravaAPIError: If the request fails
+        """
+        await self.ensure_valid_token_async()
+        
+        headers = self._auth_headers
         
         try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data,
-                params=params,
-                timeout=30
-            )
+            for attempt in range(self.max_retries + 1):
+                await self._limiter.acquire_async(max_wait=self.backoff_cap)
+                response = await self.async_client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    content=_json_dumps(data) if data is not None else None,
+                    params=params
+                )
+                
+                self._limiter.observe(response.headers)
+                delay = self._retry_delay(method, response.status_code, response.headers, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
             
             response.raise_for_status()
-            return response.json()
+            return _json_loads(response.content)
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError, RateLimitExceeded) as e:
             logger.error(f"Strava API request failed: {method} {url} - {e}")
-            raise Exception(f"Strava API request failed: {e}")
+            raise StravaAPIError.from_exception(e) from e
+    
+    def _retry_delay(self, method: str, status_code: int, headers: Mapping[str, str], attempt: int) -> Optional[float]:
+        """
+        Decide whether a response should be retried.
+        
+        Rate-limited responses honor Retry-After when present; otherwise the wait is
+        exponential backoff with jitter, capped at backoff_cap.
+        
+        Args:
+            method: HTTP method of the request
+            status_code: Response status code
+            headers: Response headers
+            attempt: Zero-based number of the attempt that produced the response
+            
+        Returns:
+            Seconds to wait before retrying, or None if the response is final
+        """
+        if attempt >= self.max_retries:
+            return None
+        if status_code != 429 and not (status_code >= 500 and method.upper() in _IDEMPOTENT_METHODS):
+            return None
+        
+        delay = min(2 ** attempt + random.uniform(0, 1), self.backoff_cap)
+        retry_after = headers.get('Retry-After')
+        if status_code == 429 and retry_after:
+            try:
+                delay = min(float(retry_after), self.backoff_cap)
+            except ValueError:
+                pass
+        
+        logger.warning(
+            "Strava API returned %s for %s; retrying in %.1fs (attempt %d of %d, rate limit usage %s)",
+            status_code, method, delay, attempt + 1, self.max_retries,
+            headers.get('X-RateLimit-Usage', 'unknown')
+        )
+        return delay
     
     def get_athlete(self) -> Dict[str, Any]:
         """
@@ -215,7 +533,17 @@ class StravaAPIClient:
             Athlete profile data
         """
         logger.info("Fetching authenticated athlete profile")
-        return self._make_authenticated_request('GET', '/athlete')
+        return self._make_authenticated_request('GET', self._athlete_url)
+    
+    async def get_athlete_async(self) -> Dict[str, Any]:
+        """
+        Get the authenticated athlete's profile (async version).
+        
+        Returns:
+            Athlete profile data
+        """
+        logger.info("Fetching authenticated athlete profile")
+        return await self._make_authenticated_request_async('GET', self._athlete_url)
     
     def create_activity(self, activity_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -228,36 +556,38 @@ class StravaAPIClient:
             Created activity data
             
         Raises:
-            Exception: If activity creation fails
+            StravaAPIError: If activity creation fails
         """
-        required_fields = ['name', 'sport_type', 'start_date_local', 'elapsed_time']
-        
-        # Validate required fields
-        for field in required_fields:
-            if field not in activity_data:
-                raise ValueError(f"Missing required field: {field}")
-        
-        # Prepare activity payload
-        payload = {
-            'name': activity_data['name'],
-            'sport_type': activity_data['sport_type'],
-            'start_date_local': activity_data['start_date_local'],
-            'elapsed_time': activity_data['elapsed_time']
-        }
-        
-        # Add optional fields
-        optional_fields = [
-            'type', 'description', 'distance', 'trainer', 'commute'
-        ]
+        payload = self._build_create_payload(activity_data)
+        logger.info(f"Creating activity: {payload['name']} ({payload['sport_type']})")
         
-        for field in optional_fields:
-            if field in activity_data:
-                payload[field] = activity_data[field]
+        try:
+            result = self._make_authenticated_request('POST', self._activities_url, data=payload)
+            logger.info(f"Successfully created activity with ID: {result.get('id')}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to create activity: {e}")
+            raise
+    
+    async def create_activity_async(self, activity_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new activity on Strava (async version).
         
+        Args:
+            activity_data: Activity data including name, type, sport_type, etc.
+            
+        Returns:
+            Created activity data
+            
+        Raises:
+            StravaAPIError: If activity creation fails
+        """
+        payload = self._build_create_payload(activity_data)
         logger.info(f"Creating activity: {payload['name']} ({payload['sport_type']})")
         
         try:
-            result = self._make_authenticated_request('POST', '/activities', data=payload)
+            result = await self._make_authenticated_request_async('POST', self._activities_url, data=payload)
             logger.info(f"Successfully created activity with ID: {result.get('id')}")
             return result
             
@@ -265,6 +595,22 @@ class StravaAPIClient:
             logger.error(f"Failed to create activity: {e}")
             raise
     
+    @staticmethod
+    def _build_create_payload(activity_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate activity data and build the create request body."""
+        # Validate required fields
+        missing = [field for field in _CREATE_REQUIRED_FIELDS if field not in activity_data]
+        if missing:
+            raise ValueError(f"Missing required field{'s' if len(missing) > 1 else ''}: {', '.join(missing)}")
+        
+        # Prepare activity payload with the required and any optional fields
+        payload = {field: activity_data[field] for field in _CREATE_REQUIRED_FIELDS}
+        for field in _CREATE_OPTIONAL_FIELDS:
+            if field in activity_data:
+                payload[field] = activity_data[field]
+        
+        return payload
+    
     def update_activity(self, activity_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update an existing activity on Strava.
@@ -276,24 +622,13 @@ class StravaAPIClient:
         Returns:
             Updated activity data
         """
-        # Allowed fields for updating
-        allowed_fields = [
-            'name', 'type', 'sport_type', 'description', 'trainer', 
-            'commute', 'hide_from_home', 'gear_id'
-        ]
-        
-        # Filter to only allowed fields
-        payload = {k: v for k, v in updates.items() if k in allowed_fields}
-        
-        if not payload:
-            raise ValueError("No valid fields provided for update")
-        
+        payload = self._build_update_payload(updates)
         logger.info(f"Updating activity {activity_id} with fields: {list(payload.keys())}")
         
         try:
             result = self._make_authenticated_request(
                 'PUT', 
-                f'/activities/{activity_id}', 
+                f'{self._activities_url}/{activity_id}', 
                 data=payload
             )
             logger.info(f"Successfully updated activity {activity_id}")
@@ -303,6 +638,44 @@ class StravaAPIClient:
             logger.error(f"Failed to update activity {activity_id}: {e}")
             raise
     
+    async def update_activity_async(self, activity_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update an existing activity on Strava (async version).
+        
+        Args:
+            activity_id: The ID of the activity to update
+            updates: Dictionary of fields to update
+            
+        Returns:
+            Updated activity data
+        """
+        payload = self._build_update_payload(updates)
+        logger.info(f"Updating activity {activity_id} with fields: {list(payload.keys())}")
+        
+        try:
+            result = await self._make_authenticated_request_async(
+                'PUT',
+                f'{self._activities_url}/{activity_id}',
+                data=payload
+            )
+            logger.info(f"Successfully updated activity {activity_id}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to update activity {activity_id}: {e}")
+            raise
+    
+    @staticmethod
+    def _build_update_payload(updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the fields Strava allows on update."""
+        # Filter to only allowed fields
+        payload = {k: v for k, v in updates.items() if k in _UPDATE_ALLOWED_FIELDS}
+        
+        if not payload:
+            raise ValueError("No valid fields provided for update")
+        
+        return payload
+    
     def get_activity(self, activity_id: int) -> Dict[str, Any]:
         """
         Get details of a specific activity.
@@ -314,7 +687,23 @@ class StravaAPIClient:
             Activity data
         """
         logger.info(f"Fetching activity {activity_id}")
-        return self._make_authenticated_request('GET', f'/activities/{activity_id}')
+        return self._make_authenticated_request('GET', f'{self._activities_url}/{activity_id}')
+    
+    async def get_activity_async(self, activity_id: int) -> Dict[str, Any]:
+        """
+        Get details of a specific activity (async version).
+        
+        Several activities can be fetched concurrently, e.g.
+        ``await asyncio.gather(*(client.get_activity_async(i) for i in ids))``.
+        
+        Args:
+            activity_id: The ID of the activity
+            
+        Returns:
+            Activity data
+        """
+        logger.info(f"Fetching activity {activity_id}")
+        return await self._make_authenticated_request_async('GET', f'{self._activities_url}/{activity_id}')
     
     def get_activities(
         self, 
@@ -335,6 +724,147 @@ class StravaAPIClient:
         Returns:
             List of activity data
         """
+        params = self._build_activities_params(before, after, page, per_page)
+        logger.info(f"Fetching activities (page {page}, {per_page} per page)")
+        return self._make_authenticated_request('GET', self._athlete_activities_url, params=params)
+    
+    async def get_activities_async(
+        self, 
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        page: int = 1,
+        per_page: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a list of the authenticated athlete's activities (async version).
+        
+        Args:
+            before: Epoch timestamp to filter activities before this time
+            after: Epoch timestamp to filter activities after this time
+            page: Page number
+            per_page: Number of activities per page
+            
+        Returns:
+            List of activity data
+        """
+        params = self._build_activities_params(before, after, page, per_page)
+        logger.info(f"Fetching activities (page {page}, {per_page} per page)")
+        return await self._make_authenticated_request_async('GET', self._athlete_activities_url, params=params)
+    
+    def iter_activities(
+        self,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        per_page: int = 200,
+        max_pages: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over activities one page at a time, so only one page is held in memory.
+        
+        Args:
+            before: Epoch timestamp to filter activities before this time
+            after: Epoch timestamp to filter activities after this time
+            per_page: Number of activities per page (Strava allows up to 200)
+            max_pages: Maximum number of pages to fetch (unbounded if None)
+            
+        Yields:
+            Activity data, newest first
+        """
+        page = 1
+        while max_pages is None or page <= max_pages:
+            activities = self.get_activities(before, after, page, per_page)
+            yield from activities
+            if len(activities) < per_page:
+                return
+            page += 1
+    
+    def get_all_activities(
+        self,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        per_page: int = 200,
+        max_pages: int = 50,
+        concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every activity in a time range, fetching pages concurrently.
+        
+        The first page is fetched alone; if it is full, later pages are fetched in
+        waves of ``concurrency`` requests until a page comes back short.
+        
+        Args:
+            before: Epoch timestamp to filter activities before this time
+            after: Epoch timestamp to filter activities after this time
+            per_page: Number of activities per page (Strava allows up to 200)
+            max_pages: Maximum number of pages to fetch
+            concurrency: Pages requested at once (keep low; requests count against the rate limit)
+            
+        Returns:
+            List of activity data, in page order
+        """
+        activities = self.get_activities(before, after, 1, per_page)
+        if len(activities) < per_page:
+            return activities
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            next_page = 2
+            while next_page <= max_pages:
+                pages = range(next_page, min(next_page + concurrency, max_pages + 1))
+                for batch in pool.map(lambda page: self.get_activities(before, after, page, per_page), pages):
+                    activities.extend(batch)
+                    if len(batch) < per_page:
+                        return activities
+                next_page = pages.stop
+        
+        return activities
+    
+    async def get_all_activities_async(
+        self,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        per_page: int = 200,
+        max_pages: int = 50,
+        concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every activity in a time range, fetching pages concurrently (async version).
+        
+        Args:
+            before: Epoch timestamp to filter activities before this time
+            after: Epoch timestamp to filter activities after this time
+            per_page: Number of activities per page (Strava allows up to 200)
+            max_pages: Maximum number of pages to fetch
+            concurrency: Pages requested at once (keep low; requests count against the rate limit)
+            
+        Returns:
+            List of activity data, in page order
+        """
+        activities = await self.get_activities_async(before, after, 1, per_page)
+        if len(activities) < per_page:
+            return activities
+        
+        next_page = 2
+        while next_page <= max_pages:
+            pages = range(next_page, min(next_page + concurrency, max_pages + 1))
+            batches = await asyncio.gather(
+                *(self.get_activities_async(before, after, page, per_page) for page in pages)
+            )
+            for batch in batches:
+                activities.extend(batch)
+                if len(batch) < per_page:
+                    return activities
+            next_page = pages.stop
+        
+        return activities
+    
+    @staticmethod
+    def _build_activities_params(
+        before: Optional[int],
+        after: Optional[int],
+        page: int,
+        per_page: int
+    ) -> Dict[str, Any]:
+        """Build the query parameters for listing activities."""
         params = {
             'page': page,
             'per_page': per_page
@@ -345,8 +875,7 @@ class StravaAPIClient:
         if after:
             params['after'] = after
         
-        logger.info(f"Fetching activities (page {page}, {per_page} per page)")
-        return self._make_authenticated_request('GET', '/athlete/activities', params=params)
+        return params
     
     def set_tokens(self, access_token: str, refresh_token: str, expires_at: int):
         """
@@ -360,4 +889,48 @@ class StravaAPIClient:
         self.access_token = access_token
         self.refresh_token = refresh_token
         self.token_expires_at = expires_at
-        logger.info("Tokens set manually")
\ No newline at end of file
+        logger.info("Tokens set manually")
+    
+    def with_tokens(
+        self,
+        access_token: Optional[str],
+        refresh_token: Optional[str],
+        expires_at: Optional[int]
+    ) -> "StravaAPIClient":
+        """
+        Create a client for one user's tokens that shares this client's HTTP pools and rate limiter.
+        
+        Refreshes on the returned client never touch this client's tokens, so concurrent
+        requests for different athletes can't see each other's credentials. Close only the
+        original client; the copies share its connections.
+        
+        Args:
+            access_token: The access token
+            refresh_token: The refresh token
+            expires_at: Token expiration timestamp
+        
+        Returns:
+            A StravaAPIClient holding the given tokens
+        """
+        client = copy.copy(self)
+        client._refresh_lock = threading.Lock()
+        client._async_refresh_lock = None
+        client.access_token = access_token
+        client.refresh_token = refresh_token
+        client.token_expires_at = expires_at
+        return client
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+    
+    def __enter__(self) -> "StravaAPIClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def aclose(self):
+        """Close the async HTTP client and the pooled HTTP session."""
+        await self.async_client.aclose()
+        self.close()
\ No newline at end of file
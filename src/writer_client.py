@@ -4,45 +4,397 @@ Writer AI API Client
 This module provides a client for interacting with the Writer AI chat completion API.
 """
 
-import requests
+import asyncio
+import atexit
+import functools
 import httpx
 import json
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import random
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .circuit_breaker import CircuitBreaker
+from .prompt_cache import SemanticPromptCache
+from .query_cache import QueryCache
+
+# Optional: faster JSON encoding and decoding (orjson.JSONDecodeError subclasses ValueError)
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    _json_loads = json.loads
+
+# Optional: HTTP/2 multiplexing needs the h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class WriterMessage:
-    """Represents a message in the Writer chat completion."""
-    role: str  # "user", "assistant", or "system"
-    content: str
+# Retried chat completion calls back off exponentially, never waiting longer than this
+RETRY_BACKOFF_CAP_SECONDS = 10.0
+
+# Context fields included in the prompts, as (label, context key) in prompt order
+_DESCRIPTION_CONTEXT_LABELS = (
+    ("Location", "location"),
+    ("Time", "time_of_day"),
+    ("Weather", "weather"),
+    ("Feeling", "feeling"),
+    ("With", "companions"),
+    ("Intensity", "intensity"),
+    ("Equipment/Setting", "equipment"),
+    ("Achievement", "achievements"),
+    ("Challenges", "challenges"),
+    ("Route", "route"),
+    ("Goals", "goals"),
+    ("Highlights", "highlights"),
+    ("Entertainment", "music"),
+    ("Nutrition", "nutrition"),
+    ("Recovery", "recovery"),
+)
+_NAME_CONTEXT_LABELS = (
+    ("Time", "time_of_day"),
+    ("Location", "location"),
+    ("Weather", "weather"),
+    ("Intensity", "intensity"),
+    ("Achievement", "achievements"),
+    ("Challenge", "challenges"),
+    ("Feeling", "feeling"),
+    ("Equipment", "equipment"),
+)
+
+# System prompts are built once at import; style-specific ones are keyed by style. The
+# style instruction goes last so every style shares the longest possible static prefix,
+# which the provider's prompt cache can reuse across requests
+_DESCRIPTION_STYLE_INSTRUCTIONS = {
+    "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages continued fitness.",
+    "casual": "Write a relaxed, friendly description as if sharing with friends on social media.",
+    "technical": "Generate a detailed, data-focused description highlighting performance metrics and technical aspects.",
+    "humorous": "Create a fun, lighthearted description with some humor while still being encouraging."
+}
+_DESCRIPTION_SYSTEM_PROMPTS = {
+    style: f"""You are a fitness enthusiast and social media expert who creates engaging Strava activity descriptions.
+
+Guidelines:
+- Keep it concise (50-150 words)
+- Be authentic and relatable
+- Include relevant emojis
+- Avoid being overly boastful
+- Make it engaging for social media
+- Don't repeat the activity name unless adding context
+
+{instruction}"""
+    for style, instruction in _DESCRIPTION_STYLE_INSTRUCTIONS.items()
+}
+
+_NAME_SYSTEM_PROMPT = """You are a creative fitness enthusiast who creates catchy, memorable names for workout activities.
+Create short, engaging activity names that are:
+- 2-6 words long
+- Creative but not too quirky
+- Appropriate for social media
+- Reflect the activity type and effort"""
+
+_QUICK_DESCRIPTION_STYLE_INSTRUCTIONS = {
+    "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages future workouts.",
+    "casual": "Write a relaxed, friendly description like you're telling a friend about your workout.",
+    "technical": "Provide a detailed, data-focused description with specific metrics and performance notes.",
+    "humorous": "Write a funny, lighthearted description that brings a smile while describing the workout."
+}
+_QUICK_DESCRIPTION_SYSTEM_PROMPTS = {
+    style: f"""You are a fitness enthusiast creating workout descriptions.
+
+Keep descriptions under 200 characters. Use relevant emojis. Be authentic and engaging.
+
+{instruction}"""
+    for style, instruction in _QUICK_DESCRIPTION_STYLE_INSTRUCTIONS.items()
+}
+
+_JOKE_NAME_SYSTEM_PROMPT = """You are a hilarious fitness comedian who creates funny, witty activity names that make people smile. Your job is to turn workout descriptions into entertaining, joke-based titles.
+
+Create names that are:
+- FUNNY and clever (puns, wordplay, humor)
+- Activity-relevant (relate to the sport/workout)
+- Positive and motivational through humor
+- Concise (under 60 characters)
+- Include relevant emojis
+- Clean and appropriate humor
+
+Examples:
+- "Why I Run: Zombies Can't Catch Me 🧟‍♂️🏃‍♂️"
+- "Two Wheels, Too Tired 🚴‍♂️😴"
+- "Making Waves & Bad Jokes 🌊😂"
+- "Pretzel Mode: Activated 🥨🧘‍♀️"
+- "Lifting My Spirits (And Weights) 💪😄"
+
+Be creative and make it genuinely funny!"""
+
+_CONTEXT_DESCRIPTION_STYLE_INSTRUCTIONS = {
+    "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages future workouts. Highlight personal victories and progress.",
+    "casual": "Write a relaxed, friendly description like you're telling a friend about your workout. Keep it conversational and authentic.",
+    "technical": "Provide a detailed, data-focused description with specific metrics and performance notes. Include technical observations.",
+    "humorous": "Write a funny, lighthearted description that brings a smile while describing the workout. Use humor appropriately."
+}
+_CONTEXT_DESCRIPTION_SYSTEM_PROMPTS = {
+    style: f"""You are a fitness enthusiast creating detailed workout descriptions.
+
+Use ALL the provided context to create a rich, personalized description that tells the story of this specific workout. Include:
+- The setting and environment
+- How they felt during and after
+- Any challenges overcome
+- Personal achievements or milestones
+- Weather or external conditions
+- Who they were with or if solo
+- Equipment used or route taken
+
+Keep descriptions under 280 characters but make them vivid and personal. Use relevant emojis. Be authentic and engaging.
+
+{instruction}"""
+    for style, instruction in _CONTEXT_DESCRIPTION_STYLE_INSTRUCTIONS.items()
+}
+
+_CONTEXT_JOKE_NAME_SYSTEM_PROMPT = """You are a hilarious fitness comedian who creates funny, witty activity names that make people smile. Your job is to turn workout descriptions into entertaining, joke-based titles.
+
+Create names that are:
+- FUNNY and clever (puns, wordplay, humor)
+- Activity-relevant (relate to the sport/workout)
+- Context-aware (use weather, location, feelings, etc. for humor)
+- Positive and motivational through humor
+- Concise (under 60 characters)
+- Include relevant emojis
+- Clean and appropriate humor
+
+Comedy styles to use:
+- Puns and wordplay related to the activity
+- Weather-based humor (if applicable)
+- Time-of-day jokes
+- Achievement/challenge humor
+- Self-deprecating but positive jokes
+- Fitness stereotypes (in a fun way)
+
+Examples:
+- Running: "Why I Run: Zombies Can't Catch Me 🧟‍♂️🏃‍♂️"
+- Cycling: "Two Wheels, Too Tired 🚴‍♂️😴"
+- Swimming: "Making Waves & Bad Jokes 🌊😂"
+- Yoga: "Pretzel Mode: Activated ��🧘‍♀️"
+- Weight Training: "Lifting My Spirits (And Weights) 💪😄"
+- Morning run: "Coffee? Nah, Endorphins Will Do ☕➡️🏃‍♂️"
+- Rainy workout: "Weathering the Storm (Literally) ⛈️💪"
+- First time: "Beginner's Luck or Sheer Determination? ��"
+
+Be creative and make it genuinely funny!"""
+
+_NAME_AND_DESCRIPTION_SYSTEM_PROMPTS = {
+    style: f"""You are a fitness enthusiast and comedian who writes both the name and the description of a Strava activity in one reply.
+
+Return ONLY valid JSON with keys "name" and "description", no extra text:
+- "name": a funny, witty, joke-based title (puns, wordplay, context-aware humor), positive and clean, under 60 characters, with relevant emojis
+- "description": a rich, personalized description that uses ALL the provided context (setting, how they felt, challenges, achievements, conditions, company, equipment or route), under 280 characters, vivid and authentic, with relevant emojis
+
+{instruction}"""
+    for style, instruction in _CONTEXT_DESCRIPTION_STYLE_INSTRUCTIONS.items()
+}
+
+# Joke names used when the Writer API gives no usable answer
+_FALLBACK_JOKE_NAMES = {
+    "Run": "Running Late (But On Purpose) 🏃‍♂️⏰",
+    "Ride": "Wheely Good Workout 🚴‍♂️😄",
+    "Swim": "Just Keep Swimming (Thanks Dory) 🐠🏊‍♂️",
+    "Hike": "Taking a Walk on the Wild Side 🥾🌲",
+    "Walk": "Walking My Way to Greatness 🚶‍♂️✨",
+    "WeightTraining": "Pumping Iron & Dad Jokes 🏋️‍♂️😂",
+    "Yoga": "Finding My Inner Peace (& Outer Pretzel) 🧘‍♀️🥨",
+    "CrossCountrySkiing": "Ski-ing My Way to Fitness ⛷️😄",
+    "Rowing": "Row, Row, Row Your Gains 🚣‍♂️💪",
+    "Elliptical": "Going Nowhere Fast (But Loving It) 🔄😅"
+}
+
+@functools.lru_cache(maxsize=64)
+def _system_message(content: str) -> Dict[str, str]:
+    """Get the shared system message for a prompt (treat it as read-only)."""
+    return {"role": "system", "content": content}
+
+@functools.lru_cache(maxsize=4096)
+def _description_activity_context(activity_type: str, distance: Optional[float], elapsed_time: Optional[int], name: str) -> str:
+    """Summarize a Strava activity for the description prompt; repeated activities hit the cache."""
+    parts = [f"Activity type: {activity_type}"]
+    if distance:
+        # Show distance in km from 1 km up, otherwise in meters
+        parts.append(f"Distance: {distance / 1000:.2f} km" if distance >= 1000 else f"Distance: {distance} meters")
+    if elapsed_time:
+        hours, seconds = divmod(elapsed_time, 3600)
+        minutes = seconds // 60
+        parts.append(f"Duration: {hours}h {minutes}m" if hours > 0 else f"Duration: {minutes} minutes")
+    if name:
+        parts.append(f"Activity name: {name}")
+    return ", ".join(parts)
+
+@functools.lru_cache(maxsize=4096)
+def _name_activity_context(activity_type: str, distance: Optional[float], elapsed_time: Optional[int]) -> str:
+    """Summarize a Strava activity for the name prompt; repeated activities hit the cache."""
+    parts = [f"Activity type: {activity_type}"]
+    if distance and distance >= 1000:
+        parts.append(f"Distance: {distance / 1000:.1f}km")
+    if elapsed_time:
+        parts.append(f"Duration: {elapsed_time // 60} minutes")
+    return ", ".join(parts)
+
+def _activity_context(
+    sport_type: str,
+    duration_minutes: int,
+    distance_km: Optional[float],
+    context: Optional[Dict[str, Any]] = None,
+    labels: Tuple[Tuple[str, str], ...] = (),
+    heading: str = ""
+) -> str:
+    """Describe an activity for a prompt: its stats, then any labelled context details under a heading."""
+    lines = [f"Activity Type: {sport_type}", f"Duration: {duration_minutes} minutes"]
+    if distance_km:
+        lines.append(f"Distance: {distance_km} km")
+    if context:
+        details = "\n".join(f"{label}: {context[key]}" for label, key in labels if context.get(key))
+        if details:
+            lines.append(f"\n{heading}:\n{details}")
+    return "\n".join(lines)
+
+def _context_description_prompts(
+    sport_type: str,
+    duration_minutes: int,
+    distance_km: Optional[float],
+    style: str,
+    context: Dict[str, Any]
+) -> Tuple[str, str, str]:
+    """Build the activity context, system prompt and user prompt for a contextual description."""
+    activity_context = _activity_context(
+        sport_type, duration_minutes, distance_km, context, _DESCRIPTION_CONTEXT_LABELS, "Additional Context"
+    )
+    
+    system_prompt = _CONTEXT_DESCRIPTION_SYSTEM_PROMPTS.get(style, _CONTEXT_DESCRIPTION_SYSTEM_PROMPTS["motivational"])
+
+    user_prompt = f"""Create a {style} description for this workout using ALL the context provided:
+
+{activity_context}
+
+Write a detailed, personalized description that captures the full experience, not just basic stats."""
+    
+    return activity_context, system_prompt, user_prompt
+
+_shared_clients: Dict[Tuple[str, str, Optional[Callable]], "WriterAPIClient"] = {}
+_shared_clients_lock = threading.Lock()
 
 class WriterAPIClient:
     """Client for interacting with the Writer AI API."""
     
-    def __init__(self, api_key: str, model: str = "palmyra-x5"):
+    @classmethod
+    def shared(
+        cls,
+        api_key: str,
+        model: str = "palmyra-x5",
+        embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None
+    ) -> "WriterAPIClient":
+        """
+        Get the process-wide client for an API key, model and embedding function.
+        
+        Sharing one client lets every caller reuse its warm connection pools and response
+        caches. The instance is created on first call (or after it was closed) and its sync
+        client is closed automatically at interpreter exit.
+        
+        Args:
+            api_key: Your Writer API key
+            model: The model to use for completions (default: palmyra-x5)
+            embed: Function returning one normalized embedding per text (see __init__)
+            
+        Returns:
+            The shared WriterAPIClient
+        """
+        key = (api_key, model, embed)
+        with _shared_clients_lock:
+            client = _shared_clients.get(key)
+            if client is None or client.client.is_closed:
+                client = cls(api_key, model, embed=embed)
+                atexit.register(client.close)
+                _shared_clients[key] = client
+            return client
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "palmyra-x5",
+        cache_size: int = 2048,
+        cache_ttl_seconds: float = 3600,
+        embed: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+        max_retries: int = 3
+    ):
         """
         Initialize the Writer API client.
         
         Args:
             api_key: Your Writer API key
             model: The model to use for completions (default: palmyra-x5)
+            cache_size: Maximum number of generated names and descriptions kept
+            cache_ttl_seconds: Seconds a generated name or description is reused for identical input
+            embed: Function returning one normalized embedding per text; enables reusing
+                descriptions for near-identical activity context (exact matching only if None)
+            max_retries: Retries for rate-limited, failed or dropped async completion calls
         """
         self.api_key = api_key
         self.model = model
+        # Fields shared by every completion request, merged into each payload
+        self._base_payload = {"model": model}
         self.base_url = "https://api.writer.com"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        # Initialize async client
-        self.client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers)
+        self.max_retries = max_retries
+        # Fail fast to the fallback text while the Writer API keeps failing
+        self.breaker = CircuitBreaker(fail_max=5, reset_timeout=30.0)
+        # Async client sized for concurrent generation; its transport retries failed connects
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=_HTTP2_AVAILABLE,
+                retries=3,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        )
+        # Pooled sync client so back-to-back completions reuse the TLS connection
+        self._sync_client = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=_HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        )
+        # Generated text for identical prompts, keyed by (model, system prompt, user prompt)
+        self.response_cache = QueryCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        # Descriptions for near-identical activity context, one cache per (model, generator, style)
+        self.embed = embed
+        self._semantic_caches: Dict[tuple, SemanticPromptCache] = {}
+    
+    def _semantic_cache(self, generator: str, style: str) -> Optional[SemanticPromptCache]:
+        """Get the semantic cache for one generator and style (None without an embedding function)."""
+        if self.embed is None:
+            return None
+        key = (self.model, generator, style)
+        cache = self._semantic_caches.get(key)
+        if cache is None:
+            cache = self._semantic_caches.setdefault(key, SemanticPromptCache(
+                embed=self.embed,
+                max_size=self.response_cache.max_size,
+                ttl_seconds=self.response_cache.ttl_seconds,
+                similarity_threshold=0.92
+            ))
+        return cache
     
     def chat_completion(
         self,
-        messages: List[WriterMessage],
+        messages: List[Dict[str, str]],
         max_tokens: Optional[int] = None,
         temperature: float = 1.0,
         top_p: Optional[float] = None,
@@ -52,7 +404,7 @@ class WriterAPIClient:
         Create a chat completion using the Writer API.
         
         Args:
-            messages: List of messages forming the conversation
+            messages: Messages forming the conversation, as {"role": ..., "content": ...} dicts
             max_tokens: Maximum number of tokens to generate
             temperature: Controls randomness (0.0 to 2.0)
             top_p: Nucleus sampling threshold
@@ -62,17 +414,12 @@ class WriterAPIClient:
             API response containing the completion
             
         Raises:
+            CircuitOpenError: If recent calls kept failing and the circuit is open
             Exception: If the API request fails
         """
-        # Convert messages to the format expected by the API
-        formatted_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
-        
         payload = {
-            "model": self.model,
-            "messages": formatted_messages,
+            **self._base_payload,
+            "messages": messages,
             "temperature": temperature,
             "stream": stream
         }
@@ -83,28 +430,220 @@ class WriterAPIClient:
         if top_p is not None:
             payload["top_p"] = top_p
         
+        self.breaker.before_call()
         try:
             logger.info(f"Making chat completion request to Writer API with model {self.model}")
-            response = requests.post(
-                f"{self.base_url}/chat",
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
+            try:
+                response = self._sync_client.post("/v1/chat/completions", content=_json_dumps(payload))
+            except httpx.TransportError:
+                self._record_outcome(None)
+                raise
+            self._record_outcome(response.status_code)
             
             response.raise_for_status()
-            result = response.json()
+            result = _json_loads(response.content)
             
             logger.info("Successfully received response from Writer API")
             return result
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Writer API request failed: {e}")
             raise Exception(f"Failed to get response from Writer API: {e}")
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             logger.error(f"Failed to parse Writer API response: {e}")
             raise Exception(f"Invalid JSON response from Writer API: {e}")
-    
+
+    def _record_outcome(self, status_code: Optional[int]):
+        """Feed a call's outcome to the circuit breaker (status_code is None if no response arrived)."""
+        if status_code is None or status_code == 429 or status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def _post_chat(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        POST a chat completion, retrying rate limits, server errors and dropped connections.
+        
+        Waits grow exponentially with jitter, honoring Retry-After on 429 responses.
+        
+        Args:
+            payload: Chat completion request body
+            
+        Returns:
+            The final response, whatever its status
+            
+        Raises:
+            CircuitOpenError: If recent calls kept failing and the circuit is open
+            httpx.TransportError: If the last attempt fails without a response
+        """
+        self.breaker.before_call()
+        body = _json_dumps(payload)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post("/v1/chat/completions", content=body)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    self._record_outcome(None)
+                    raise
+                logger.warning(f"Writer API request failed, retrying: {e}")
+                response = None
+            
+            if response is not None:
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt >= self.max_retries:
+                    self._record_outcome(response.status_code)
+                    return response
+            
+            delay = min(2 ** attempt + random.uniform(0, 1), RETRY_BACKOFF_CAP_SECONDS)
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            if retry_after:
+                try:
+                    delay = min(float(retry_after), RETRY_BACKOFF_CAP_SECONDS)
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+
+    async def _stream_deltas(self, payload: Dict[str, Any], timeout: float = 30.0) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding the reply content as it arrives.
+
+        Args:
+            payload: Chat completion request body (streaming is enabled here)
+            timeout: httpx timeout in seconds for each connect, read and write (not the whole
+                stream; bound the total with asyncio.wait_for)
+
+        Yields:
+            Pieces of the reply content, in order
+
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+        """
+        async with self.client.stream(
+            "POST", "/v1/chat/completions", content=_json_dumps({**payload, "stream": True}), timeout=timeout
+        ) as response:
+            response.raise_for_status()
+
+            # Servers that ignore the stream flag answer with a regular completion
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                result = _json_loads(await response.aread())
+                yield result["choices"][0]["message"]["content"]
+                return
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                choices = _json_loads(data).get("choices")
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+    async def stream_json_completion(self, payload: Dict[str, Any], timeout: float = 30.0) -> str:
+        """
+        Stream a chat completion whose reply is a JSON object, stopping once the object closes.
+
+        Closing the stream early drops any trailing tokens (closing code fences, chatter)
+        instead of waiting for the model to finish generating them.
+
+        Args:
+            payload: Chat completion request body (streaming is enabled here)
+            timeout: httpx timeout in seconds for each connect, read and write (not the whole
+                stream; bound the total with asyncio.wait_for)
+
+        Returns:
+            The reply content, ending at the closing brace of the top-level JSON object
+
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+        """
+        parts = []
+        depth = 0
+        in_string = False
+        escaped = False
+
+        deltas = self._stream_deltas(payload, timeout)
+        try:
+            async for delta in deltas:
+                # Track brace depth outside string literals to find the end of the object
+                for index, char in enumerate(delta):
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif char == "\\":
+                            escaped = True
+                        elif char == '"':
+                            in_string = False
+                    elif char == '"':
+                        in_string = True
+                    elif char == "{":
+                        depth += 1
+                    elif char == "}" and depth > 0:
+                        depth -= 1
+                        if depth == 0:
+                            parts.append(delta[:index + 1])
+                            return "".join(parts)
+                parts.append(delta)
+        finally:
+            # Closing the generator closes the response, ending the stream early
+            await deltas.aclose()
+
+        return "".join(parts)
+
+    async def stream_activity_description(
+        self,
+        sport_type: str,
+        duration_minutes: int,
+        distance_km: Optional[float] = None,
+        style: str = "motivational",
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a contextual activity description as it is generated, e.g. to show it while it is written.
+
+        Uses the same prompts as generate_activity_description_with_context and fills the same cache.
+
+        Args:
+            sport_type: Type of sport
+            duration_minutes: Duration in minutes
+            distance_km: Distance in kilometers (optional)
+            style: Style of description to generate
+            context: Additional activity context (location, weather, feeling, ...)
+
+        Yields:
+            Pieces of the description text
+
+        Raises:
+            httpx.HTTPError: If the request fails (there is no fallback text when streaming)
+        """
+        _, system_prompt, user_prompt = _context_description_prompts(
+            sport_type, duration_minutes, distance_km, style, context or {}
+        )
+        cache_key = (self.model, system_prompt, user_prompt)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        async for delta in self._stream_deltas({
+            **self._base_payload,
+            "messages": [
+                _system_message(system_prompt),
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 150,
+            "temperature": 0.8
+        }):
+            parts.append(delta)
+            yield delta
+
+        description = "".join(parts).strip().strip('"\'')
+        if description:
+            self.response_cache.put(cache_key, description)
+
     def generate_activity_description(
         self,
         activity_data: Dict[str, Any],
@@ -126,51 +665,9 @@ class WriterAPIClient:
         elapsed_time = activity_data.get("elapsed_time")
         name = activity_data.get("name", "")
         
-        # Build context for the AI
-        context_parts = [f"Activity type: {activity_type}"]
-        
-        if distance:
-            # Convert distance from meters to more readable units
-            if distance >= 1000:
-                distance_km = distance / 1000
-                context_parts.append(f"Distance: {distance_km:.2f} km")
-            else:
-                context_parts.append(f"Distance: {distance} meters")
-        
-        if elapsed_time:
-            # Convert elapsed time to hours and minutes
-            hours = elapsed_time // 3600
-            minutes = (elapsed_time % 3600) // 60
-            if hours > 0:
-                context_parts.append(f"Duration: {hours}h {minutes}m")
-            else:
-                context_parts.append(f"Duration: {minutes} minutes")
-        
-        if name:
-            context_parts.append(f"Activity name: {name}")
-        
-        activity_context = ", ".join(context_parts)
+        activity_context = _description_activity_context(activity_type, distance, elapsed_time, name)
         
-        # Create the prompt based on style
-        style_instructions = {
-            "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages continued fitness.",
-            "casual": "Write a relaxed, friendly description as if sharing with friends on social media.",
-            "technical": "Generate a detailed, data-focused description highlighting performance metrics and technical aspects.",
-            "humorous": "Create a fun, lighthearted description with some humor while still being encouraging."
-        }
-        
-        instruction = style_instructions.get(style, style_instructions["motivational"])
-        
-        system_prompt = f"""You are a fitness enthusiast and social media expert who creates engaging Strava activity descriptions. 
-{instruction}
-
-Guidelines:
-- Keep it concise (50-150 words)
-- Be authentic and relatable
-- Include relevant emojis
-- Avoid being overly boastful
-- Make it engaging for social media
-- Don't repeat the activity name unless adding context"""
+        system_prompt = _DESCRIPTION_SYSTEM_PROMPTS.get(style, _DESCRIPTION_SYSTEM_PROMPTS["motivational"])
 
         user_prompt = f"""Create an engaging Strava activity description for this workout:
 
@@ -179,8 +676,8 @@ Guidelines:
 Make it {style} in tone and include 2-3 relevant emojis."""
 
         messages = [
-            WriterMessage(role="system", content=system_prompt),
-            WriterMessage(role="user", content=user_prompt)
+            _system_message(system_prompt),
+            {"role": "user", "content": user_prompt}
         ]
         
         try:
@@ -218,25 +715,9 @@ Make it {style} in tone and include 2-3 relevant emojis."""
         distance = activity_data.get("distance")
         elapsed_time = activity_data.get("elapsed_time")
         
-        # Build context
-        context_parts = [f"Activity type: {activity_type}"]
+        activity_context = _name_activity_context(activity_type, distance, elapsed_time)
         
-        if distance and distance >= 1000:
-            distance_km = distance / 1000
-            context_parts.append(f"Distance: {distance_km:.1f}km")
-        
-        if elapsed_time:
-            minutes = elapsed_time // 60
-            context_parts.append(f"Duration: {minutes} minutes")
-        
-        activity_context = ", ".join(context_parts)
-        
-        system_prompt = """You are a creative fitness enthusiast who creates catchy, memorable names for workout activities.
-Create short, engaging activity names that are:
-- 2-6 words long
-- Creative but not too quirky
-- Appropriate for social media
-- Reflect the activity type and effort"""
+        system_prompt = _NAME_SYSTEM_PROMPT
 
         user_prompt = f"""Create a catchy name for this workout:
 
@@ -245,8 +726,8 @@ Create short, engaging activity names that are:
 Give me just the name, no extra text or quotes."""
 
         messages = [
-            WriterMessage(role="system", content=system_prompt),
-            WriterMessage(role="user", content=user_prompt)
+            _system_message(system_prompt),
+            {"role": "user", "content": user_prompt}
         ]
         
         try:
@@ -278,22 +759,9 @@ Give me just the name, no extra text or quotes."""
     ) -> str:
         """Generate an activity description using AI (async version)."""
         try:
-            # Build activity context
-            activity_context = f"Activity Type: {sport_type}\nDuration: {duration_minutes} minutes"
-            if distance_km:
-                activity_context += f"\nDistance: {distance_km} km"
+            activity_context = _activity_context(sport_type, duration_minutes, distance_km)
             
-            # Style-specific prompts
-            style_prompts = {
-                "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages future workouts.",
-                "casual": "Write a relaxed, friendly description like you're telling a friend about your workout.",
-                "technical": "Provide a detailed, data-focused description with specific metrics and performance notes.",
-                "humorous": "Write a funny, lighthearted description that brings a smile while describing the workout."
-            }
-            
-            system_prompt = f"""You are a fitness enthusiast creating workout descriptions. {style_prompts.get(style, style_prompts['motivational'])}
-
-Keep descriptions under 200 characters. Use relevant emojis. Be authentic and engaging."""
+            system_prompt = _QUICK_DESCRIPTION_SYSTEM_PROMPTS.get(style, _QUICK_DESCRIPTION_SYSTEM_PROMPTS["motivational"])
 
             user_prompt = f"""Create a {style} description for this workout:
 
@@ -301,26 +769,36 @@ Keep descriptions under 200 characters. Use relevant emojis. Be authentic and en
 
 Write just the description, no extra text."""
 
-            response = await self.client.post(
-                "/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": 100,
-                    "temperature": 0.9
-                }
-            )
+            cache_key = (self.model, system_prompt, user_prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            semantic_cache = self._semantic_cache("description", style)
+            if semantic_cache is not None:
+                cached = await semantic_cache.lookup_async(activity_context)
+                if cached is not None:
+                    return cached
+            
+            response = await self._post_chat({
+                **self._base_payload,
+                "messages": [
+                    _system_message(system_prompt),
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 100,
+                "temperature": 0.9
+            })
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
                 if "choices" in response_data and len(response_data["choices"]) > 0:
                     description = response_data["choices"][0]["message"]["content"].strip()
                     # Remove quotes if present
                     description = description.strip('"\'')
                     logger.info(f"Generated activity description: {description}")
+                    self.response_cache.put(cache_key, description)
+                    if semantic_cache is not None:
+                        await semantic_cache.insert_async(activity_context, description)
                     return description
             
             # Fallback description
@@ -337,29 +815,9 @@ Write just the description, no extra text."""
         distance_km: Optional[float] = None
     ) -> str:
         """Generate a funny, joke-based activity name using AI (async version)."""
-        # Build activity context
-        activity_context = f"Activity Type: {sport_type}\nDuration: {duration_minutes} minutes"
-        if distance_km:
-            activity_context += f"\nDistance: {distance_km} km"
+        activity_context = _activity_context(sport_type, duration_minutes, distance_km)
         
-        system_prompt = """You are a hilarious fitness comedian who creates funny, witty activity names that make people smile. Your job is to turn workout descriptions into entertaining, joke-based titles.
-
-Create names that are:
-- FUNNY and clever (puns, wordplay, humor)
-- Activity-relevant (relate to the sport/workout)
-- Positive and motivational through humor
-- Concise (under 60 characters)
-- Include relevant emojis
-- Clean and appropriate humor
-
-Examples:
-- "Why I Run: Zombies Can't Catch Me 🧟‍♂️🏃‍♂️"
-- "Two Wheels, Too Tired 🚴‍♂️😴"
-- "Making Waves & Bad Jokes 🌊😂"
-- "Pretzel Mode: Activated 🥨🧘‍♀️"
-- "Lifting My Spirits (And Weights) 💪😄"
-
-Be creative and make it genuinely funny!"""
+        system_prompt = _JOKE_NAME_SYSTEM_PROMPT
 
         user_prompt = f"""Create a hilarious, joke-based name for this workout:
 
@@ -368,43 +826,34 @@ Be creative and make it genuinely funny!"""
 Give me just the funny name with emojis, no extra text or quotes."""
 
         try:
-            response = await self.client.post(
-                "/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": 70,
-                    "temperature": 1.2
-                }
-            )
+            cache_key = (self.model, system_prompt, user_prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = await self._post_chat({
+                **self._base_payload,
+                "messages": [
+                    _system_message(system_prompt),
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 70,
+                "temperature": 1.2
+            })
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
                 if "choices" in response_data and len(response_data["choices"]) > 0:
                     name = response_data["choices"][0]["message"]["content"].strip()
                     # Remove quotes if present
                     name = name.strip('"\'')
                     logger.info(f"Generated joke activity name: {name}")
+                    self.response_cache.put(cache_key, name)
                     return name
             
             # Fallback funny names
-            fallback_jokes = {
-                "Run": "Running Late (But On Purpose) 🏃‍♂️⏰",
-                "Ride": "Wheely Good Workout 🚴‍♂️😄",
-                "Swim": "Just Keep Swimming (Thanks Dory) 🐠🏊‍♂️",
-                "Hike": "Taking a Walk on the Wild Side 🥾🌲",
-                "Walk": "Walking My Way to Greatness 🚶‍♂️✨",
-                "WeightTraining": "Pumping Iron & Dad Jokes 🏋️‍♂️😂",
-                "Yoga": "Finding My Inner Peace (& Outer Pretzel) 🧘‍♀️🥨",
-                "CrossCountrySkiing": "Ski-ing My Way to Fitness ⛷️😄",
-                "Rowing": "Row, Row, Row Your Gains 🚣‍♂️💪",
-                "Elliptical": "Going Nowhere Fast (But Loving It) 🔄😅"
-            }
-            
-            return fallback_jokes.get(sport_type, f"{sport_type} & Giggles 😄💪")
+            
+            return _FALLBACK_JOKE_NAMES.get(sport_type, f"{sport_type} & Giggles 😄💪")
                 
         except Exception as e:
             logger.error(f"Failed to generate joke activity name: {e}")
@@ -423,96 +872,41 @@ Give me just the funny name with emojis, no extra text or quotes."""
             if context is None:
                 context = {}
             
-            # Build rich activity context
-            activity_context = f"Activity Type: {sport_type}\nDuration: {duration_minutes} minutes"
-            if distance_km:
-                activity_context += f"\nDistance: {distance_km} km"
-            
-            # Add rich context details
-            context_details = []
-            if context.get("location"):
-                context_details.append(f"Location: {context['location']}")
-            if context.get("time_of_day"):
-                context_details.append(f"Time: {context['time_of_day']}")
-            if context.get("weather"):
-                context_details.append(f"Weather: {context['weather']}")
-            if context.get("feeling"):
-                context_details.append(f"Feeling: {context['feeling']}")
-            if context.get("companions"):
-                context_details.append(f"With: {context['companions']}")
-            if context.get("intensity"):
-                context_details.append(f"Intensity: {context['intensity']}")
-            if context.get("equipment"):
-                context_details.append(f"Equipment/Setting: {context['equipment']}")
-            if context.get("achievements"):
-                context_details.append(f"Achievement: {context['achievements']}")
-            if context.get("challenges"):
-                context_details.append(f"Challenges: {context['challenges']}")
-            if context.get("route"):
-                context_details.append(f"Route: {context['route']}")
-            if context.get("goals"):
-                context_details.append(f"Goals: {context['goals']}")
-            if context.get("highlights"):
-                context_details.append(f"Highlights: {context['highlights']}")
-            if context.get("music"):
-                context_details.append(f"Entertainment: {context['music']}")
-            if context.get("nutrition"):
-                context_details.append(f"Nutrition: {context['nutrition']}")
-            if context.get("recovery"):
-                context_details.append(f"Recovery: {context['recovery']}")
-            
-            if context_details:
-                activity_context += f"\n\nAdditional Context:\n" + "\n".join(context_details)
-            
-            # Style-specific prompts
-            style_prompts = {
-                "motivational": "Create an inspiring and motivational description that celebrates the achievement and encourages future workouts. Highlight personal victories and progress.",
-                "casual": "Write a relaxed, friendly description like you're telling a friend about your workout. Keep it conversational and authentic.",
-                "technical": "Provide a detailed, data-focused description with specific metrics and performance notes. Include technical observations.",
-                "humorous": "Write a funny, lighthearted description that brings a smile while describing the workout. Use humor appropriately."
-            }
-            
-            system_prompt = f"""You are a fitness enthusiast creating detailed workout descriptions. {style_prompts.get(style, style_prompts['motivational'])}
-
-Use ALL the provided context to create a rich, personalized description that tells the story of this specific workout. Include:
-- The setting and environment
-- How they felt during and after
-- Any challenges overcome
-- Personal achievements or milestones
-- Weather or external conditions
-- Who they were with or if solo
-- Equipment used or route taken
-
-Keep descriptions under 280 characters but make them vivid and personal. Use relevant emojis. Be authentic and engaging."""
-
-            user_prompt = f"""Create a {style} description for this workout using ALL the context provided:
-
-{activity_context}
-
-Write a detailed, personalized description that captures the full experience, not just basic stats."""
-
-            response = await self.client.post(
-                "/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": 150,
-                    "temperature": 0.8
-                },
-                timeout=30.0
+            activity_context, system_prompt, user_prompt = _context_description_prompts(
+                sport_type, duration_minutes, distance_km, style, context
             )
             
+            cache_key = (self.model, system_prompt, user_prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            semantic_cache = self._semantic_cache("description_with_context", style)
+            if semantic_cache is not None:
+                cached = await semantic_cache.lookup_async(activity_context)
+                if cached is not None:
+                    return cached
+            
+            response = await self._post_chat({
+                **self._base_payload,
+                "messages": [
+                    _system_message(system_prompt),
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 150,
+                "temperature": 0.8
+            })
+            
             if response.status_code == 200:
                 try:
-                    response_data = response.json()
+                    response_data = _json_loads(response.content)
                     if "choices" in response_data and len(response_data["choices"]) > 0:
                         description = response_data["choices"][0]["message"]["content"].strip()
                         # Remove quotes if present
                         description = description.strip('"\'')
                         logger.info(f"Generated contextual activity description: {description}")
+                        self.response_cache.put(cache_key, description)
+                        if semantic_cache is not None:
+                            await semantic_cache.insert_async(activity_context, description)
                         return description
                 except Exception as e:
                     logger.error(f"Error parsing description response: {e}")
@@ -544,63 +938,12 @@ Write a detailed, personalized description that captures the full experience, no
             if context is None:
                 context = {}
                 
-            # Build activity context for joke generation
-            activity_context = f"Activity Type: {sport_type}\nDuration: {duration_minutes} minutes"
-            if distance_km:
-                activity_context += f"\nDistance: {distance_km} km"
-            
-            # Add key context for joke creation
-            joke_context = []
-            if context.get("time_of_day"):
-                joke_context.append(f"Time: {context['time_of_day']}")
-            if context.get("location"):
-                joke_context.append(f"Location: {context['location']}")
-            if context.get("weather"):
-                joke_context.append(f"Weather: {context['weather']}")
-            if context.get("intensity"):
-                joke_context.append(f"Intensity: {context['intensity']}")
-            if context.get("achievements"):
-                joke_context.append(f"Achievement: {context['achievements']}")
-            if context.get("challenges"):
-                joke_context.append(f"Challenge: {context['challenges']}")
-            if context.get("feeling"):
-                joke_context.append(f"Feeling: {context['feeling']}")
-            if context.get("equipment"):
-                joke_context.append(f"Equipment: {context['equipment']}")
-            
-            if joke_context:
-                activity_context += f"\n\nContext:\n" + "\n".join(joke_context)
+            # Build activity context with the details that make for good jokes
+            activity_context = _activity_context(
+                sport_type, duration_minutes, distance_km, context, _NAME_CONTEXT_LABELS, "Context"
+            )
         
-            system_prompt = """You are a hilarious fitness comedian who creates funny, witty activity names that make people smile. Your job is to turn workout descriptions into entertaining, joke-based titles.
-
-Create names that are:
-- FUNNY and clever (puns, wordplay, humor)
-- Activity-relevant (relate to the sport/workout)
-- Context-aware (use weather, location, feelings, etc. for humor)
-- Positive and motivational through humor
-- Concise (under 60 characters)
-- Include relevant emojis
-- Clean and appropriate humor
-
-Comedy styles to use:
-- Puns and wordplay related to the activity
-- Weather-based humor (if applicable)
-- Time-of-day jokes
-- Achievement/challenge humor
-- Self-deprecating but positive jokes
-- Fitness stereotypes (in a fun way)
-
-Examples:
-- Running: "Why I Run: Zombies Can't Catch Me 🧟‍♂️🏃‍♂️"
-- Cycling: "Two Wheels, Too Tired 🚴‍♂️😴"
-- Swimming: "Making Waves & Bad Jokes 🌊😂"
-- Yoga: "Pretzel Mode: Activated ��🧘‍♀️"
-- Weight Training: "Lifting My Spirits (And Weights) 💪😄"
-- Morning run: "Coffee? Nah, Endorphins Will Do ☕➡️🏃‍♂️"
-- Rainy workout: "Weathering the Storm (Literally) ⛈️💪"
-- First time: "Beginner's Luck or Sheer Determination? ��"
-
-Be creative and make it genuinely funny!"""
+            system_prompt = _CONTEXT_JOKE_NAME_SYSTEM_PROMPT
 
             user_prompt = f"""Create a hilarious, joke-based name for this workout:
 
@@ -608,28 +951,30 @@ Be creative and make it genuinely funny!"""
 
 Make it funny and relevant to the activity and context. Give me just the joke name with emojis, no extra text or quotes."""
 
-            response = await self.client.post(
-                "/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": 80,
-                    "temperature": 1.2  # Higher temperature for more creative/funny results
-                },
-                timeout=30.0
-            )
+            cache_key = (self.model, system_prompt, user_prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = await self._post_chat({
+                **self._base_payload,
+                "messages": [
+                    _system_message(system_prompt),
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 80,
+                "temperature": 1.2  # Higher temperature for more creative/funny results
+            })
             
             if response.status_code == 200:
                 try:
-                    response_data = response.json()
+                    response_data = _json_loads(response.content)
                     if "choices" in response_data and len(response_data["choices"]) > 0:
                         name = response_data["choices"][0]["message"]["content"].strip()
                         # Remove quotes if present
                         name = name.strip('"\'')
                         logger.info(f"Generated joke activity name: {name}")
+                        self.response_cache.put(cache_key, name)
                         return name
                 except Exception as e:
                     logger.error(f"Error parsing name response: {e}")
@@ -637,21 +982,123 @@ Make it funny and relevant to the activity and context. Give me just the joke na
                 logger.error(f"Writer API error for name: {response.status_code} - {response.text}")
             
             # Fallback funny names based on activity type
-            fallback_jokes = {
-                "Run": "Running Late (But On Purpose) 🏃‍♂️⏰",
-                "Ride": "Wheely Good Workout 🚴‍♂️😄",
-                "Swim": "Just Keep Swimming (Thanks Dory) 🐠🏊‍♂️",
-                "Hike": "Taking a Walk on the Wild Side 🥾🌲",
-                "Walk": "Walking My Way to Greatness 🚶‍♂️✨",
-                "WeightTraining": "Pumping Iron & Dad Jokes 🏋️‍♂️😂",
-                "Yoga": "Finding My Inner Peace (& Outer Pretzel) 🧘‍♀️🥨",
-                "CrossCountrySkiing": "Ski-ing My Way to Fitness ⛷️😄",
-                "Rowing": "Row, Row, Row Your Gains 🚣‍♂️💪",
-                "Elliptical": "Going Nowhere Fast (But Loving It) 🔄😅"
-            }
-            
-            return fallback_jokes.get(sport_type, f"{sport_type} & Giggles 😄💪")
+            
+            return _FALLBACK_JOKE_NAMES.get(sport_type, f"{sport_type} & Giggles 😄💪")
                 
         except Exception as e:
             logger.error(f"Failed to generate joke activity name: {e}")
-            return f"{sport_type} Comedy Hour 😂💪"
\ No newline at end of file
+            return f"{sport_type} Comedy Hour 😂💪"
+
+    async def generate_name_and_description(
+        self,
+        sport_type: str,
+        duration_minutes: int,
+        distance_km: Optional[float] = None,
+        style: str = "motivational",
+        context: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, str]:
+        """
+        Generate an activity name and description with a single Writer call.
+        
+        Falls back to the separate name and description generators if the combined
+        reply cannot be used.
+        
+        Args:
+            sport_type: Type of sport
+            duration_minutes: Duration in minutes
+            distance_km: Distance in kilometers (optional)
+            style: Style of description to generate
+            context: Additional activity context (location, weather, feeling, ...)
+            
+        Returns:
+            The (name, description) pair
+        """
+        if context is None:
+            context = {}
+        
+        try:
+            activity_context, _, _ = _context_description_prompts(
+                sport_type, duration_minutes, distance_km, style, context
+            )
+            system_prompt = _NAME_AND_DESCRIPTION_SYSTEM_PROMPTS.get(style, _NAME_AND_DESCRIPTION_SYSTEM_PROMPTS["motivational"])
+            user_prompt = f"""Create a joke name and a {style} description for this workout:
+
+{activity_context}"""
+            
+            cache_key = (self.model, system_prompt, user_prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = await self._post_chat({
+                **self._base_payload,
+                "messages": [
+                    _system_message(system_prompt),
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 250,
+                "temperature": 0.9
+            })
+            
+            if response.status_code == 200:
+                content = _json_loads(response.content)["choices"][0]["message"]["content"]
+                # Ignore any code fences or chatter around the JSON object
+                result = _json_loads(content[content.index("{"):content.rindex("}") + 1])
+                name = str(result["name"]).strip().strip('"\'')
+                description = str(result["description"]).strip().strip('"\'')
+                if name and description:
+                    logger.info(f"Generated activity name and description: {name}")
+                    self.response_cache.put(cache_key, (name, description))
+                    return name, description
+                logger.error("Writer API returned an empty name or description")
+            else:
+                logger.error(f"Writer API error for name and description: {response.status_code} - {response.text}")
+                
+        except Exception as e:
+            logger.error(f"Failed to generate activity name and description together: {e}")
+        
+        name, description = await asyncio.gather(
+            self.generate_activity_name_with_context(sport_type, duration_minutes, distance_km, context),
+            self.generate_activity_description_with_context(sport_type, duration_minutes, distance_km, style, context)
+        )
+        return name, description
+
+    async def generate_many(
+        self,
+        activities: List[Dict[str, Any]],
+        style: str = "motivational",
+        concurrency: int = 20
+    ) -> List[Tuple[str, str]]:
+        """
+        Generate names and descriptions for many activities concurrently, e.g. for a backfill.
+        
+        Args:
+            activities: Dicts with sport_type and duration_minutes, and optionally distance_km and context
+            style: Style of the descriptions
+            concurrency: Maximum activities in flight at once
+            
+        Returns:
+            One (name, description) pair per activity, in the same order as ``activities``
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def generate(activity: Dict[str, Any]) -> Tuple[str, str]:
+            async with semaphore:
+                return await self.generate_name_and_description(
+                    activity["sport_type"],
+                    activity["duration_minutes"],
+                    activity.get("distance_km"),
+                    style,
+                    activity.get("context")
+                )
+        
+        return list(await asyncio.gather(*(generate(activity) for activity in activities)))
+
+    def close(self):
+        """Close the pooled sync HTTP client."""
+        self._sync_client.close()
+
+    async def aclose(self):
+        """Close the pooled sync and async HTTP clients."""
+        await self.client.aclose()
+        self.close()
@@ -0,0 +1,18 @@
+// Add some interactive flair
+document.addEventListener('DOMContentLoaded', function() {
+    const sections = document.querySelectorAll('.section');
+    sections.forEach(section => {
+        section.addEventListener('mouseenter', function() {
+            this.style.borderColor = '#fc4c02';
+        });
+        section.addEventListener('mouseleave', function() {
+            this.style.borderColor = '#e0e0e0';
+        });
+    });
+
+    // Auto-focus first input if form is visible
+    const firstInput = document.querySelector('input[name="duration_minutes"]');
+    if (firstInput && !firstInput.closest('.hidden')) {
+        setTimeout(() => firstInput.focus(), 500);
+    }
+});
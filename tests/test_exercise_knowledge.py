@@ -0,0 +1,56 @@
+"""
+Tests for the exercise knowledge base lookups that don't need Weaviate.
+"""
+
+import unittest
+import zlib
+
+from src.exercise_knowledge import _EXERCISE_SEED, ExerciseKnowledgeBase, _match_seed_keywords
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _WordHashEmbedder:
+    """Stand-in for a sentence-transformers model: a bag of hashed words per text."""
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, normalize_embeddings=True):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % 64] += 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class SeedResultTypesTest(unittest.TestCase):
+    def test_keyword_shortcut_returns_plain_types(self):
+        result = _match_seed_keywords("walk", 1)[0]
+        self.assertEqual(result["sport_type"], "Walk")
+        self.assertIs(type(result["sport_type"]), str)
+        self.assertIs(type(result["intensity_level"]), str)
+        for field in ("synonyms", "muscle_groups", "equipment", "location_types", "keywords"):
+            self.assertIsInstance(result[field], list, field)
+
+    def test_embedding_text_accepts_seed_rows(self):
+        text = ExerciseKnowledgeBase._embedding_text(_EXERCISE_SEED[0])
+        self.assertTrue(text.startswith("Running "))
+        self.assertIn("jogging", text)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class LocalIndexTest(unittest.TestCase):
+    def test_local_index_builds_from_seed(self):
+        kb = ExerciseKnowledgeBase(weaviate_url="http://localhost:1")
+        kb.embedder = _WordHashEmbedder()
+
+        results = kb._search_local(kb.embed_many(["swimming laps freestyle"])[0], limit=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["sport_type"], "Swim")
+        self.assertIsInstance(results[0]["keywords"], list)
+
+
+if __name__ == "__main__":
+    unittest.main()